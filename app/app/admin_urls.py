@@ -0,0 +1,10 @@
+"""Admin URLs loaded on the first admin request with LEAN_STARTUP
+
+SimpleAdminConfig leaves out autodiscovering the admin modules at boot,
+they are registered here instead.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -9,8 +9,10 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from core.asgi import thread_per_request
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+# sync code of concurrent requests runs in parallel instead of on one thread
+application = thread_per_request(get_asgi_application())
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
     "rest_framework",
     "rest_framework.authtoken",
@@ -46,7 +47,19 @@ INSTALLED_APPS = [
     "recipe",
 ]
 
+# lean production profile for fast worker boot: the admin modules and the
+# schema tooling are imported by the first request to their URLs, see
+# manage.py profile_startup
+LEAN_STARTUP = os.environ.get("LEAN_STARTUP", "0") == "1"
+if LEAN_STARTUP:
+    # same admin without autodiscovering admin.py modules, app/admin_urls.py does
+    INSTALLED_APPS[INSTALLED_APPS.index("django.contrib.admin")] = "django.contrib.admin.apps.SimpleAdminConfig"
+
 MIDDLEWARE = [
+    # first so it times the whole request, removes itself when disabled
+    "core.middleware.InstrumentationMiddleware",
+    # before everything else touching the response body
+    "core.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,8 +67,34 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # 503 for logins outside DRF, e.g. the admin's, when password hashing is saturated
+    "core.middleware.HashingBusyMiddleware",
 ]
 
+# per view query counts and timings in Server-Timing headers and /metrics/
+INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "0") == "1"
+# bearer token required by /metrics/ when set
+INSTRUMENTATION_METRICS_TOKEN = os.environ.get("INSTRUMENTATION_METRICS_TOKEN", "")
+
+# gzip response compression, plus brotli and zstd when the brotli and zstandard
+# packages are installed, preferred in this order when the client takes several
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_ENCODINGS = os.environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+# smaller bodies fit a packet anyway, streamed ones are always compressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# tests using core.tests.utils.QueryBudgetMixin fail on requests without a query budget
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "0") == "1"
+
+# serve the OpenAPI schema rendered once per process, files written by
+# manage.py build_schema are served instead when SCHEMA_ARTIFACT_DIR is set
+SCHEMA_CACHE = os.environ.get("SCHEMA_CACHE", "1") == "1"
+SCHEMA_ARTIFACT_DIR = os.environ.get("SCHEMA_ARTIFACT_DIR", "")
+
+# admin changelists show Postgres' row estimate instead of an exact
+# COUNT(*) once it reaches this many rows
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get("ADMIN_EXACT_COUNT_LIMIT", 10000))
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -79,17 +118,60 @@ WSGI_APPLICATION = "app.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# DB_POOL=1 returns connections to an in process pool instead of closing
+# them, otherwise DB_CONN_MAX_AGE keeps a connection per thread open
+
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "core.backends.postgresql_pool" if DB_POOL else "django.db.backends.postgresql",
         "HOST": os.environ.get("DB_HOST"),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
+        # pooled connections go back to the pool after every request
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0 if DB_POOL else 60)),
+        "POOL": {
+            "MAX_IDLE": int(os.environ.get("DB_POOL_MAX_IDLE", 10)),
+            "MAX_LIFETIME": int(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+            "HEALTH_CHECK": os.environ.get("DB_POOL_HEALTH_CHECK", "1") == "1",
+        },
+    }
+}
+
+# DB_REPLICA_HOSTS=host1,host2 adds read replicas sharing the primary's
+# credentials, GET requests of the recipe and user APIs read from them
+for index, host in enumerate(filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(","))):
+    DATABASES[f"replica_{index}"] = {**DATABASES["default"], "HOST": host, "TEST": {"MIRROR": "default"}}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+# seconds a user keeps reading from the primary after a write, should
+# cover the replication lag
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# locmem by default, point CACHE_BACKEND/CACHE_LOCATION at a shared
+# Redis compatible backend (e.g. django_redis.cache.RedisCache) in prod
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
+# seconds a cached recipe response is kept, writes invalidate it sooner
+RECIPE_CACHE_TIMEOUT = int(os.environ.get("RECIPE_CACHE_TIMEOUT", 300))
+
+# in process token -> user lookups, bounds how long other workers may
+# keep authenticating a deleted token or deactivated user
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get("TOKEN_AUTH_CACHE_SIZE", 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get("TOKEN_AUTH_CACHE_TTL", 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -109,6 +191,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+# the first hasher is used for new hashes, the others verify older ones
+# which are rehashed with the first on the next successful login
+
+PASSWORD_HASHERS = [
+    "core.hashers.Argon2PasswordHasher",
+    "core.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+# raising any cost rehashes existing passwords as users log in
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get("PASSWORD_ARGON2_MEMORY_COST", 19456))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get("PASSWORD_ARGON2_PARALLELISM", 1))
+
+# threads hashing passwords, 0 hashes in the request thread. They cap concurrent
+# hashes, request threads still wait for theirs: at most QUEUE_SIZE wait for a
+# worker, later logins get a 503 after TIMEOUT seconds, right away by default
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 0))
+PASSWORD_HASHING_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASHING_QUEUE_SIZE", 16))
+PASSWORD_HASHING_TIMEOUT = float(os.environ.get("PASSWORD_HASHING_TIMEOUT", 0))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -136,4 +241,31 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
 
-REST_FRAMEWORK = {"DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"}
+REST_FRAMEWORK = {
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # DRF's handler, plus a 503 when no password hashing slot is free
+    "EXCEPTION_HANDLER": "core.exceptions.exception_handler",
+    # orjson backed JSON, falls back to the stdlib when orjson isn't installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # sliding window limits of core.throttling, an empty env var disables a scope
+    "DEFAULT_THROTTLE_RATES": {
+        "token": os.environ.get("THROTTLE_RATE_TOKEN", "30/min") or None,
+        "token_email": os.environ.get("THROTTLE_RATE_TOKEN_EMAIL", "10/min") or None,
+        "signup": os.environ.get("THROTTLE_RATE_SIGNUP", "20/hour") or None,
+        "recipe_write": os.environ.get("THROTTLE_RATE_RECIPE_WRITE", "120/min") or None,
+    },
+    # reverse proxies in front of the app, throttles key on the address the last of them saw.
+    # 0 keys on REMOTE_ADDR, X-Forwarded-For is set by clients otherwise
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+}
+
+# per process counters used while the shared cache is unreachable
+THROTTLE_LOCAL_CACHE_SIZE = int(os.environ.get("THROTTLE_LOCAL_CACHE_SIZE", 10000))
@@ -13,21 +13,34 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from core.lazy import lazy_include, lazy_view
+from core.views import metrics_view
+from django.conf import settings
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+if settings.LEAN_STARTUP:
+    # imported by the first request to them instead of at boot
+    admin_urls = lazy_include("admin/", "app.admin_urls", namespace="admin")
+    schema_view = lazy_view("core.schema.CachedSpectacularAPIView")
+    swagger_view = lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="api-schema")
+else:
+    from core.schema import CachedSpectacularAPIView
+    from django.contrib import admin
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    admin_urls = path("admin/", admin.site.urls)
+    schema_view = CachedSpectacularAPIView.as_view()
+    swagger_view = SpectacularSwaggerView.as_view(url_name="api-schema")
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
-    # add url and generate schema file
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    admin_urls,
+    # schema generated once per process, or read from SCHEMA_ARTIFACT_DIR
+    path("api/schema/", schema_view, name="api-schema"),
     # serve swagger view from schema
-    path(
-        "api/swagger/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
-        name="api-swagger",
-    ),
+    path("api/swagger/", swagger_view, name="api-swagger"),
     # include urls from a different app
     path("api/user/", include("user.urls")),
     path("api/recipe/", include("recipe.urls")),
+    # Prometheus scrape target, 404 unless INSTRUMENTATION_ENABLED
+    path("metrics/", metrics_view, name="metrics"),
 ]
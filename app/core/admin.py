@@ -1,18 +1,110 @@
 """Django admin customization"""
 
+import json
+from typing import Optional
+
 from core import models
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
 
 # in case we want to introduce translations latter in the project
 from django.utils.translation import gettext_lazy as _
+from recipe.cache import invalidate_user_cache
+from recipe.filters import SEARCH_CONFIG
+
+# estimates below this are counted exactly, which is cheap at that size
+EXACT_COUNT_LIMIT = getattr(settings, "ADMIN_EXACT_COUNT_LIMIT", 10000)
+
+
+def estimate_count(queryset) -> Optional[int]:
+    """Row count estimated by Postgres, None if it has no statistics yet"""
+
+    with connections[queryset.db].cursor() as cursor:
+        if not queryset.query.where:
+            # whole table, kept up to date by (auto)vacuum and analyze
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            # -1 until the table is first analyzed
+            return int(row[0]) if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    # psycopg2 parses json columns already
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large result sets from planner estimates
+
+    An exact COUNT(*) reads every matching row, estimates come from table
+    statistics or the query plan in constant time. Page numbers past the
+    real end are simply empty.
+    """
+
+    is_estimate = False
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < EXACT_COUNT_LIMIT:
+            return self.object_list.count()
+
+        self.is_estimate = True
+        return estimate
+
+
+class KeysetChangeList(ChangeList):
+    """Changelist linking to the next page by id instead of an OFFSET
+
+    Deep page numbers make Postgres skip all earlier rows, the keyset link
+    filters on the last id shown so every page costs the same.
+    """
+
+    @property
+    def next_keyset_url(self) -> Optional[str]:
+        ordering = self.model_admin.ordering or ()
+        # only while the list is in its default id order
+        if ORDER_VAR in self.params or not ordering or ordering[0] not in ("id", "-id"):
+            return None
 
+        results = list(self.result_list)
+        if len(results) < self.list_per_page:
+            return None
 
-class UserAdmin(BaseUserAdmin):
+        lookup = "id__lt" if ordering[0] == "-id" else "id__gt"
+        return self.get_query_string({lookup: results[-1].pk}, [PAGE_VAR, "id__lt", "id__gt"])
+
+
+class ScalableAdminMixin:
+    """Changelist settings that keep large tables fast"""
+
+    paginator = EstimatedCountPaginator
+    # the unfiltered total would be another full count
+    show_full_result_count = False
+    change_list_template = "admin/core/keyset_change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
     """Define admin pages for the users"""
 
     ordering = ["id"]
     list_display = ["email", "name"]
+    # served by the UPPER(...) trigram indexes (migration 0006) used by icontains
+    search_fields = ["email", "name"]
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (_("Permissions"), {"fields": ("is_active", "is_staff", "is_superuser")}),
@@ -38,5 +130,55 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class RecipeAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """Define admin pages for the recipes"""
+
+    ordering = ["-id"]
+    list_display = ["id", "title", "user", "price", "time_minutes"]
+    # owner loaded in the same query instead of one per row
+    list_select_related = ["user"]
+    # a select would render every user
+    raw_id_fields = ["user"]
+    search_fields = ["title"]
+
+    def get_queryset(self, request):
+        # searched in SQL only, never shown
+        return super().get_queryset(request).defer("search_vector")
+
+    def get_search_results(self, request, queryset, search_term):
+        # full text search over the GIN indexed search_vector instead of
+        # icontains, which scans the table
+        terms = search_term.strip()
+        if not terms:
+            return queryset, False
+
+        condition = Q(search_vector=SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch"))
+        if terms.isdigit():
+            condition |= Q(pk=int(terms))
+        if "@" in terms:
+            condition |= Q(user__email__iexact=terms)
+
+        return queryset.filter(condition), False
+
+    # API responses are cached per owner, admin writes must invalidate them
+    # like the API's own writes do
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_user_cache(obj.user_id)
+        if change and "user" in form.changed_data:
+            invalidate_user_cache(form.initial["user"])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_user_cache(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list("user_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_user_cache(user_id)
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Recipe)
+admin.site.register(models.Recipe, RecipeAdmin)
@@ -0,0 +1,28 @@
+"""ASGI application wrapper for the async views"""
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.db import connections
+
+
+def thread_per_request(application):
+    """Run the sync code of every request on a thread of its own
+
+    Django 3.2's ASGIHandler sets no ThreadSensitiveContext, so asgiref
+    queues the thread sensitive sync_to_async calls of all requests, the
+    ORM reads of the async views among them, on one thread per process.
+    In a context per request, as Django 4.0 does it, each request gets its
+    own thread and its connections are closed before the thread goes away.
+    """
+
+    async def wrapper(scope, receive, send):
+        if scope["type"] != "http":
+            return await application(scope, receive, send)
+
+        async with ThreadSensitiveContext():
+            try:
+                await application(scope, receive, send)
+            finally:
+                # connections are per thread, this one ends with the request
+                await sync_to_async(connections.close_all)()
+
+    return wrapper
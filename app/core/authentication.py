@@ -0,0 +1,86 @@
+"""Authentication classes for the APIs"""
+
+import copy
+
+from asgiref.sync import sync_to_async
+from core.cache import TTLCache
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+# token key -> (user, token), evicted by signals when either changes
+token_cache = TTLCache(
+    maxsize=getattr(settings, "TOKEN_AUTH_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that memoizes the token -> user lookup
+
+    Drop in replacement for TokenAuthentication which saves the token/user
+    join on every request while the token is in the cache.
+    """
+
+    def authenticate_credentials(self, key):
+        credentials = self.get_cached_credentials(key)
+
+        if credentials is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, (user, token))
+            credentials = (copy.copy(user), copy.copy(token))
+
+        return credentials
+
+    def get_cached_credentials(self, key):
+        """Return (user, token) of a cached token or None, never queries the DB"""
+
+        cached = token_cache.get(key)
+        if cached is None:
+            return None
+
+        user, token = cached
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        # each request gets its own instances so views can't mutate the cached ones
+        return (copy.copy(user), copy.copy(token))
+
+
+async def aauthenticate_token(request):
+    """Resolve the token of a plain Django request without blocking the event loop
+
+    Cached tokens are resolved in the loop itself, only a cache miss runs
+    the database lookup in a worker thread. Returns None when the request
+    has no valid token.
+    """
+
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != CachedTokenAuthentication.keyword.lower().encode():
+        return None
+
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return None
+
+    authentication = CachedTokenAuthentication()
+    try:
+        credentials = authentication.get_cached_credentials(key)
+        if credentials is None:
+            credentials = await sync_to_async(authentication.authenticate_credentials)(key)
+    except exceptions.AuthenticationFailed:
+        return None
+
+    return credentials[0]
+
+
+def invalidate_token(key: str) -> None:
+    """Forget cached lookup for the token"""
+    token_cache.pop(key)
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """Forget cached lookups for every token of the user"""
+    token_cache.pop_where(lambda cached: cached[0].pk == user_id)
@@ -0,0 +1,58 @@
+"""PostgreSQL backend returning connections to an in process pool
+
+Enable with ENGINE "core.backends.postgresql_pool", pool options are read
+from the POOL key of the database settings:
+
+    MAX_IDLE      idle connections kept per database (default 10)
+    MAX_LIFETIME  seconds before a connection is closed for good (default 1800)
+    HEALTH_CHECK  probe idle connections before reusing them (default True)
+
+Only idle connections are capped, every thread still opens one when the
+pool has none left. The connections open at once are bounded by the
+threads serving requests, which have to fit the server's max_connections.
+"""
+
+from core.backends.postgresql_pool.pool import clear_pools, get_pool
+from django.db.backends.postgresql import base, creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # pooled connections would keep the test database in use
+        clear_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get("POOL", {})
+        key = tuple(sorted((name, str(value)) for name, value in conn_params.items()))
+        name = f"{self.alias}:{conn_params.get('database') or ''}"
+        return get_pool(
+            key,
+            name,
+            max_idle=options.get("MAX_IDLE", 10),
+            max_lifetime=options.get("MAX_LIFETIME", 1800),
+            health_check=options.get("HEALTH_CHECK", True),
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        connection = pool.checkout()
+
+        if connection is None:
+            connection = super().get_new_connection(conn_params)
+            pool.track(connection)
+        else:
+            # normally set by the parent when opening the connection
+            self.isolation_level = self.settings_dict["OPTIONS"].get("isolation_level", connection.isolation_level)
+
+        self._pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.checkin(self.connection)
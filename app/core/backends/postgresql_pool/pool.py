@@ -0,0 +1,193 @@
+"""In process pool of idle psycopg2 connections
+
+Django opens one connection per thread and closes it at the end of the
+request (or once CONN_MAX_AGE passes). The pool keeps closed connections
+open instead and hands them to the next thread asking for one, so a
+request only pays for a new connection when no idle one is left.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from core.management.commands.wait_for_db import DB_ERRORS
+from psycopg2 import InterfaceError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+def is_healthy(connection) -> bool:
+    """Probe connection with a trivial query"""
+
+    if connection.closed:
+        return False
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        return True
+    except DB_ERRORS + (InterfaceError,):
+        return False
+
+
+class ConnectionPool:
+    """Thread safe LIFO of idle connections
+
+    Connections are rolled back and their session state discarded on
+    check in. At most max_idle idle connections are kept, connections
+    over the limit are closed on check in rather than making threads wait.
+    Connections in use aren't limited, there is one per thread using the
+    database like without the pool. Connections
+    older than max_lifetime seconds are closed so server side memory and
+    settings changes don't pile up, and idle ones are probed before they
+    are handed out when health_check is on.
+    """
+
+    def __init__(
+        self,
+        max_idle: int,
+        max_lifetime: float,
+        health_check: bool = True,
+        probe: Callable[[object], bool] = is_healthy,
+    ) -> None:
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.probe = probe
+        # (connection, created at) pairs, most recently returned last
+        self._idle: Deque[Tuple[object, float]] = deque()
+        self._created: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.checkouts = self.reused = self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def checkout(self) -> Optional[object]:
+        """Return a healthy idle connection or None if a new one is needed"""
+
+        with self._lock:
+            self.checkouts += 1
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, created_at = self._idle.pop()
+
+            # probe outside the lock, it is a round trip to the server
+            if self._expired(created_at) or (self.health_check and not self.probe(connection)):
+                self._discard(connection)
+                continue
+
+            with self._lock:
+                self.reused += 1
+                self._created[id(connection)] = created_at
+            return connection
+
+    def track(self, connection) -> None:
+        """Record a newly opened connection so its lifetime is enforced"""
+
+        with self._lock:
+            self._created[id(connection)] = time.monotonic()
+
+    def checkin(self, connection) -> None:
+        """Keep connection for reuse or close it"""
+
+        with self._lock:
+            created_at = self._created.pop(id(connection), time.monotonic())
+
+        if connection.closed or self._expired(created_at) or not self._reset(connection):
+            self._discard(connection)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((connection, created_at))
+                return
+
+        self._discard(connection)
+
+    def clear(self) -> None:
+        """Close every idle connection"""
+
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters describing how well connections are reused"""
+
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "reuse_rate": self.reused / self.checkouts if self.checkouts else 0.0,
+            }
+
+    def _expired(self, created_at: float) -> bool:
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _reset(self, connection) -> bool:
+        """Leave connection outside of any transaction and as if newly opened, False if that fails"""
+
+        try:
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            # SET parameters, temporary tables, prepared statements, advisory
+            # locks and LISTENs of the last user, DISCARD can't run in a transaction
+            autocommit = connection.autocommit
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute("DISCARD ALL")
+            connection.autocommit = autocommit
+            return connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        except DB_ERRORS + (InterfaceError,):
+            return False
+
+    def _discard(self, connection) -> None:
+        with self._lock:
+            self.discarded += 1
+
+        try:
+            connection.close()
+        except DB_ERRORS + (InterfaceError,):
+            pass
+
+
+_pools: Dict[Hashable, ConnectionPool] = {}
+_names: Dict[Hashable, str] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: Hashable, name: str, **options) -> ConnectionPool:
+    """Return the pool for key creating it on first use"""
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(**options)
+            _names[key] = name
+        return _pools[key]
+
+
+def clear_pools() -> None:
+    """Close idle connections of every pool"""
+
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    for pool in pools:
+        pool.clear()
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """Reuse statistics of every pool by name"""
+
+    with _pools_lock:
+        pools = [(_names[key], pool) for key, pool in _pools.items()]
+
+    return {name: pool.stats() for name, pool in pools}
@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark commands"""
+
+import math
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 1) -> List[float]:
+    """Run func repeat times after the warmup runs, return durations in seconds"""
+
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+
+    return durations
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest rank percentile of samples"""
+
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Latency summary of samples in milliseconds"""
+
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
@@ -0,0 +1,79 @@
+"""In process caches shared by the apps"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Thread safe LRU mapping whose entries expire after ttl seconds
+
+    Least recently used entries are dropped once maxsize is reached so
+    memory stays bounded no matter how many keys are seen.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value or None if missing or expired"""
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            self._trim()
+
+    def incr(self, key: Hashable, delta: int = 1) -> int:
+        """Add delta to a counter, missing or expired counters start at 0"""
+
+        with self._lock:
+            now = time.monotonic()
+            value, expires_at = self._data.get(key, (0, now + self.ttl))
+            if expires_at < now:
+                value, expires_at = 0, now + self.ttl
+
+            value += delta
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            self._trim()
+            return value
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop every entry whose value matches the predicate"""
+
+        with self._lock:
+            for key in [key for key, (value, _) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def _trim(self) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
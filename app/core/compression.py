@@ -0,0 +1,130 @@
+"""Response body compression for the compression middleware
+
+gzip is always available, brotli and zstd only when their packages
+(brotli, zstandard) are installed. Compressors work incrementally, so
+streamed bodies are compressed chunk by chunk as they are sent.
+"""
+
+import re
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional encoding
+    zstandard = None
+
+# fast levels, API responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# text formats served by the APIs and the schema views. HTML is left out: admin
+# and browsable API pages carry the CSRF token next to reflected input, which
+# compression would leak through the response size (BREACH)
+COMPRESSIBLE_TYPE = re.compile(
+    r"^(text/(?!html\b)|application/(json|javascript|xml|yaml|x-ndjson|vnd\.oai\.openapi)"
+    r"|application/[\w.+-]+\+(json|xml))"
+)
+
+Q_VALUE = re.compile(r"^q=([0-9.]+)$")
+
+
+class GzipCompressor:
+    """Incremental gzip compressor
+
+    flush() returns everything compressed so far, so the client can decode
+    what it got, finish() ends the stream.
+    """
+
+    def __init__(self) -> None:
+        # wbits 31 writes the gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(GzipCompressor):
+    """brotli.Compressor with the interface of GzipCompressor"""
+
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(GzipCompressor):
+    """zstandard compressobj with the interface of GzipCompressor"""
+
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Content-Encoding token -> compressor factory, of the installed packages
+COMPRESSORS: Dict[str, Callable] = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def is_compressible(content_type: str) -> bool:
+    return bool(COMPRESSIBLE_TYPE.match(content_type.lower()))
+
+
+def negotiate(accept_encoding: str, preferred: Iterable[str]) -> Optional[str]:
+    """Encoding to respond with, of preferred in order of preference, None to send the body as is
+
+    Follows the q-values of Accept-Encoding, ties go to the earlier
+    preferred encoding, q=0 and encodings not installed are never picked.
+    """
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            match = Q_VALUE.match(param.replace(" ", ""))
+            if match:
+                try:
+                    q = float(match.group(1))
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+
+    best, best_q = None, 0.0
+    for coding in preferred:
+        if coding not in COMPRESSORS:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+
+    return best
@@ -0,0 +1,123 @@
+"""Read replica routing
+
+Reads only go to a replica inside a routing scope that opted in, which
+API views do for safe methods through ReplicaReadMixin. Everything else,
+including authentication, reads from the primary. Once a request writes
+it sticks to the primary, and so do the user's following requests for
+DATABASE_REPLICA_PIN_SECONDS, long enough for replicas to catch up.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT_DB_ALIAS = "default"
+
+
+class RoutingState:
+    """Routing decisions of the current request"""
+
+    __slots__ = ("use_replica", "wrote")
+
+    def __init__(self) -> None:
+        self.use_replica = False
+        self.wrote = False
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar("db_routing_state", default=None)
+
+
+def _replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def _pin_key(user_id: int) -> str:
+    return f"db:primary_pin:{user_id}"
+
+
+def pin_primary(user_id: int) -> None:
+    """Send reads of user to the primary until replicas caught up"""
+    cache.set(_pin_key(user_id), True, getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5))
+
+
+def is_pinned(user_id: int) -> bool:
+    return bool(cache.get(_pin_key(user_id)))
+
+
+@contextmanager
+def routing_scope(user_id: Optional[int] = None, use_replica: bool = False) -> Iterator[RoutingState]:
+    """Track routing of one request, pinning user to the primary if it wrote"""
+
+    state = RoutingState()
+    token = _state.set(state)
+    try:
+        if use_replica:
+            read_from_replica(user_id)
+        yield state
+    finally:
+        _state.reset(token)
+        if state.wrote and user_id is not None:
+            pin_primary(user_id)
+
+
+def read_from_replica(user_id: Optional[int]) -> None:
+    """Let following reads of the current scope go to a replica"""
+
+    state = _state.get()
+    if state is not None and _replicas() and not (user_id is not None and is_pinned(user_id)):
+        state.use_replica = True
+
+
+class ReplicaRouter:
+    """Route reads of opted in scopes to a random replica"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        return random.choice(_replicas())
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # read after write must see the write
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas receive the schema through replication
+        if db in _replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve GET/HEAD of an API view from a replica
+
+    Authentication runs on the primary, only the handler's reads move.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with routing_scope() as state:
+            response = super().dispatch(request, *args, **kwargs)
+
+        user_id = getattr(getattr(self.request, "user", None), "pk", None)
+        if state.wrote and user_id is not None:
+            pin_primary(user_id)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            read_from_replica(request.user.pk)
@@ -0,0 +1,23 @@
+"""Exception handling of the DRF views"""
+
+from core.hashers import HashingBusy
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+class HashingUnavailable(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many concurrent logins, try again shortly.")
+    default_code = "hashing_busy"
+    # sent as Retry-After by DRF's exception handler
+    wait = 1
+
+
+def exception_handler(exc, context):
+    """DRF's handler, also answering errors raised outside of DRF code"""
+
+    if isinstance(exc, HashingBusy):
+        exc = HashingUnavailable()
+
+    return drf_exception_handler(exc, context)
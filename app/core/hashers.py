@@ -0,0 +1,87 @@
+"""Password hashers for the auth system
+
+Argon2 is the preferred hasher. Its cost is set by the
+PASSWORD_ARGON2_* settings, and users whose hash is weaker (or still
+PBKDF2) are rehashed transparently on their next successful login.
+
+Hashes are CPU and memory heavy and run outside the GIL, so
+PASSWORD_HASHING_WORKERS can run them on a small bounded thread pool.
+That is a concurrency cap with load shedding, not offloading: the
+request thread still waits for its hash, but no more hashes run at once
+than there are workers, and at most PASSWORD_HASHING_QUEUE_SIZE more
+wait for one. Requests beyond that fail with HashingBusy right away, or
+after PASSWORD_HASHING_TIMEOUT seconds if set, instead of holding their
+worker thread. The DRF views and HashingBusyMiddleware, i.e. the admin
+login, answer it with a 503.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingBusy(Exception):
+    """No hashing slot was free within the timeout"""
+
+
+class HashingPool:
+    """Thread pool running at most workers hashes, queue_size more may wait
+
+    With no workers hashes run in the calling thread.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="hashing") if workers else None
+        self._slots = threading.BoundedSemaphore(workers + queue_size) if workers else None
+        self._local = threading.local()
+
+    def run(self, func: Callable, *args, **kwargs):
+        # hashers calling each other (PBKDF2 verify encodes) stay in the worker
+        if self._executor is None or getattr(self._local, "in_worker", False):
+            return func(*args, **kwargs)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy()
+        try:
+            return self._executor.submit(self._call, func, args, kwargs).result()
+        finally:
+            self._slots.release()
+
+    def _call(self, func: Callable, args, kwargs):
+        self._local.in_worker = True
+        return func(*args, **kwargs)
+
+
+hashing_pool = HashingPool(
+    workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 0),
+    queue_size=getattr(settings, "PASSWORD_HASHING_QUEUE_SIZE", 16),
+    timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT", 0),
+)
+
+
+class PooledHasherMixin:
+    """Run encode and verify through the hashing pool"""
+
+    def encode(self, *args, **kwargs):
+        return hashing_pool.run(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return hashing_pool.run(super().verify, *args, **kwargs)
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    """Argon2id with costs from settings, defaults follow the OWASP minimum"""
+
+    time_cost = getattr(settings, "PASSWORD_ARGON2_TIME_COST", 2)
+    # KiB
+    memory_cost = getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 19456)
+    parallelism = getattr(settings, "PASSWORD_ARGON2_PARALLELISM", 1)
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    """Verifies hashes created before Argon2 was the preferred hasher"""
@@ -0,0 +1,25 @@
+"""Plain Django responses for views living outside DRF"""
+
+from core.metrics import measure_serialization
+from core.renderers import FastJSONRenderer
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated
+
+SAFE_METHODS = ["GET", "HEAD"]
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """JSON response rendered like the DRF views render theirs"""
+
+    with measure_serialization():
+        content = FastJSONRenderer().render(data)
+    return HttpResponse(content, content_type="application/json", status=status_code)
+
+
+def unauthorized_response() -> HttpResponse:
+    """401 matching DRF's token authentication failure"""
+
+    response = json_response({"detail": NotAuthenticated.default_detail}, status.HTTP_401_UNAUTHORIZED)
+    response["WWW-Authenticate"] = "Token"
+    return response
@@ -0,0 +1,75 @@
+"""URL patterns importing their views on the first matching request
+
+With LEAN_STARTUP workers skip importing the admin and the schema
+tooling at boot, which most of them never serve, and pay for it on the
+first request to those URLs instead.
+"""
+
+import threading
+from typing import Optional
+
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path: str, **initkwargs):
+    """View importing the view or view class at dotted_path when first called
+
+    Class based views are set up with as_view(**initkwargs). CSRF exemption
+    is only known after the import, so use it for views of safe methods.
+    """
+
+    view = None
+    lock = threading.Lock()
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            with lock:
+                if view is None:
+                    target = import_string(dotted_path)
+                    view = target.as_view(**initkwargs) if hasattr(target, "as_view") else target
+        return view(request, *args, **kwargs)
+
+    wrapper.__name__ = wrapper.__qualname__ = dotted_path.rsplit(".", 1)[-1]
+    wrapper.__module__ = dotted_path.rsplit(".", 1)[0]
+    return wrapper
+
+
+class LazyURLResolver(URLResolver):
+    """Resolver importing its urlconf module when a path or name of it is looked up
+
+    The parent resolver populates all nested ones on the first reverse()
+    of any name, this one stays unloaded until its own names are needed.
+    """
+
+    def _populate(self):
+        if "urlconf_module" in self.__dict__:
+            super()._populate()
+
+    @property
+    def reverse_dict(self):
+        # cached_property, imports the module on first access
+        self.urlconf_module
+        return super().reverse_dict
+
+    @property
+    def namespace_dict(self):
+        self.urlconf_module
+        return super().namespace_dict
+
+    @property
+    def app_dict(self):
+        self.urlconf_module
+        return super().app_dict
+
+
+def lazy_include(route: str, urlconf: str, namespace: Optional[str] = None) -> URLResolver:
+    """include() importing the urlconf module on the first request below route
+
+    include() imports right away, the resolver imports once it matches a
+    path or a name of the namespace is reversed.
+    """
+
+    return LazyURLResolver(RoutePattern(route, is_endpoint=False), urlconf, app_name=namespace, namespace=namespace)
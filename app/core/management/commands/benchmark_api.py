@@ -0,0 +1,222 @@
+"""
+Django command benchmarking the recipe and user APIs against a seeded database
+"""
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from core import seeding
+from core.benchmark import summarize
+from core.models import Recipe
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+EMAIL_DOMAIN = "benchmark-api.example.com"
+PASSWORD = "benchmark-pass-123"
+
+SCENARIOS = [
+    "recipe-list",
+    "recipe-create",
+    "recipe-retrieve",
+    "recipe-update",
+    "user-create",
+    "user-token",
+    "user-me",
+]
+
+# keys identifying the same measurement in two runs
+RESULT_KEY = ("scenario", "users", "recipes", "concurrency")
+
+
+class Command(BaseCommand):
+    help = "Seed users and recipes, call the API endpoints in process and report throughput and latency percentiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+        parser.add_argument("--users", type=int, default=10, help="users seeded per dataset")
+        parser.add_argument(
+            "--recipes", type=int, nargs="+", default=[10, 1000], help="mean recipes per user, one dataset per value"
+        )
+        parser.add_argument(
+            "--skew", type=float, default=0, help="Pareto shape of recipes per user as in seed_recipes, 0 for uniform"
+        )
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="parallel clients")
+        parser.add_argument("--requests", type=int, default=100, help="requests per scenario, dataset and concurrency")
+        parser.add_argument("--page-size", type=int, help="list recipes with ?page_size= instead of all at once")
+        parser.add_argument("--no-cache", action="store_true", help="disable response caching to measure the DB path")
+        parser.add_argument("--seed", type=int, default=0, help="random seed for reproducible request sequences")
+        parser.add_argument("--baseline", help="JSON output of an earlier run to compare against")
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        if options["users"] < 1 or min(options["recipes"]) < 1:
+            raise CommandError("--users and --recipes must be at least 1")
+
+        baseline = self.load_baseline(options["baseline"]) if options["baseline"] else {}
+        overrides = {
+            # measure the endpoints, not the rate limits
+            "REST_FRAMEWORK": {
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": {scope: None for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]},
+            },
+        }
+        if options["no_cache"]:
+            overrides["CACHES"] = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+        results = []
+        with override_settings(**overrides):
+            for recipes in options["recipes"]:
+                # client threads use their own connections, the data must be committed
+                tokens = self.seed(options, recipes)
+                try:
+                    for concurrency in options["concurrency"]:
+                        for scenario in options["scenarios"]:
+                            summary = self.run(scenario, tokens, concurrency, options["requests"], options)
+                            summary.update(
+                                scenario=scenario, users=options["users"], recipes=recipes, concurrency=concurrency
+                            )
+                            previous = baseline.get(tuple(summary[key] for key in RESULT_KEY))
+                            if previous:
+                                summary.update(baseline_p50_ms=previous["p50_ms"], baseline_p95_ms=previous["p95_ms"])
+                            results.append(summary)
+                finally:
+                    self.cleanup()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            line = (
+                f"{result['scenario']:>15} recipes={result['recipes']:<7} c={result['concurrency']:<3} "
+                f"{result['rps']:8.1f} req/s  p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                f"p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+            )
+            if "baseline_p50_ms" in result:
+                change = (result["p50_ms"] / result["baseline_p50_ms"] - 1) * 100
+                line += f"  p50 {change:+.1f}% vs baseline"
+            self.stdout.write(line)
+
+    def load_baseline(self, path: str) -> Dict[Tuple, Dict]:
+        try:
+            with open(path) as f:
+                results = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read baseline {path}: {e}")
+
+        return {tuple(result[key] for key in RESULT_KEY): result for result in results}
+
+    def seed(self, options: Dict, recipes: int) -> List[Tuple[str, List[int]]]:
+        """Create the dataset, return token and recipe ids of the users owning recipes, heaviest first"""
+
+        self.cleanup()
+        counts = seeding.seed(
+            options["users"],
+            recipes,
+            EMAIL_DOMAIN,
+            PASSWORD,
+            skew=options["skew"],
+            tokens=True,
+            random_seed=options["seed"],
+        )
+        user_ids = [user_id for user_id, count in sorted(counts, key=lambda pair: -pair[1]) if count]
+        # only as many users as clients are acting
+        user_ids = user_ids[: max(options["concurrency"])]
+        keys = dict(Token.objects.filter(user_id__in=user_ids).values_list("user_id", "key"))
+
+        return [
+            (keys[user_id], list(Recipe.objects.filter(user_id=user_id).values_list("id", flat=True)))
+            for user_id in user_ids
+        ]
+
+    def cleanup(self) -> None:
+        seeding.clear(EMAIL_DOMAIN)
+
+    def request_factory(self, scenario: str, options: Dict) -> Callable[..., int]:
+        """Function sending one request of the scenario, returns the status code"""
+
+        recipes_url = reverse("recipe:recipe-list")
+        list_params = {"page_size": options["page_size"]} if options["page_size"] else {}
+        counter = itertools.count()
+
+        def recipe_list(client, auth, ids, n, rng):
+            return client.get(recipes_url, list_params, HTTP_AUTHORIZATION=auth).status_code
+
+        def recipe_create(client, auth, ids, n, rng):
+            payload = {"title": f"Created {n}", "time_minutes": 10, "price": "4.50"}
+            res = client.post(recipes_url, payload, content_type="application/json", HTTP_AUTHORIZATION=auth)
+            return res.status_code
+
+        def recipe_retrieve(client, auth, ids, n, rng):
+            url = reverse("recipe:recipe-detail", args=[rng.choice(ids)])
+            return client.get(url, HTTP_AUTHORIZATION=auth).status_code
+
+        def recipe_update(client, auth, ids, n, rng):
+            url = reverse("recipe:recipe-detail", args=[rng.choice(ids)])
+            payload = {"time_minutes": n % 120 + 1}
+            return client.patch(url, payload, content_type="application/json", HTTP_AUTHORIZATION=auth).status_code
+
+        def user_create(client, auth, ids, n, rng):
+            # unique across threads, removed with the dataset
+            payload = {"email": f"new{next(counter)}@{EMAIL_DOMAIN}", "password": PASSWORD, "name": "New"}
+            return client.post(reverse("user:create"), payload).status_code
+
+        def user_token(client, auth, ids, n, rng):
+            email = f"user{n % options['users']}@{EMAIL_DOMAIN}"
+            return client.post(reverse("user:token"), {"email": email, "password": PASSWORD}).status_code
+
+        def user_me(client, auth, ids, n, rng):
+            return client.get(reverse("user:me"), HTTP_AUTHORIZATION=auth).status_code
+
+        return {
+            "recipe-list": recipe_list,
+            "recipe-create": recipe_create,
+            "recipe-retrieve": recipe_retrieve,
+            "recipe-update": recipe_update,
+            "user-create": user_create,
+            "user-token": user_token,
+            "user-me": user_me,
+        }[scenario]
+
+    def run(self, scenario: str, tokens: List[Tuple[str, List[int]]], concurrency: int, total: int, options: Dict):
+        """Send total requests of the scenario from concurrency threads, each acting as one user"""
+
+        send = self.request_factory(scenario, options)
+        shares = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+
+        def client_loop(worker: int, count: int) -> List[Tuple[float, bool]]:
+            key, ids = tokens[worker % len(tokens)]
+            auth = f"Token {key}"
+            # localhost passes the DEBUG ALLOWED_HOSTS check, testserver only does in tests
+            client = Client(SERVER_NAME="localhost")
+            rng = random.Random(options["seed"] + worker)
+            samples = []
+            try:
+                # untimed so connection setup doesn't skew the first sample
+                send(client, auth, ids, worker, rng)
+                for n in range(count):
+                    started = time.perf_counter()
+                    status_code = send(client, auth, ids, worker + n * concurrency, rng)
+                    samples.append((time.perf_counter() - started, status_code < 400))
+            finally:
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            chunks = executor.map(client_loop, range(concurrency), shares)
+            samples = [sample for chunk in chunks for sample in chunk]
+        elapsed = time.perf_counter() - started
+
+        summary = summarize([duration for duration, _ in samples])
+        summary.update(rps=len(samples) / elapsed, errors=sum(not ok for _, ok in samples))
+        return summary
@@ -0,0 +1,71 @@
+"""
+Django command comparing the JSON renderers and parsers on recipe list payloads
+"""
+import io
+import json
+import tracemalloc
+from decimal import Decimal
+
+from core.benchmark import measure, summarize
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+from django.core.management.base import BaseCommand
+from recipe.serializers import RecipeRowEncoder
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+def peak_allocated(func) -> int:
+    """Peak bytes allocated while running func once"""
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = "Measure latency and allocations of JSON rendering/parsing of recipe list payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="list sizes to benchmark")
+        parser.add_argument("--repeat", type=int, default=20, help="timed runs per size and implementation")
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        results = []
+        implementations = {
+            "drf": (JSONRenderer(), JSONParser()),
+            "fast": (FastJSONRenderer(), FastJSONParser()),
+        }
+
+        for rows in options["rows"]:
+            # same shape as a RecipeViewSet list response
+            payload = RecipeRowEncoder().encode_many(
+                (i, f"Recipe {i}", i % 120, Decimal("9.99"), "https://example.com/recipe.pdf") for i in range(rows)
+            )
+            body = JSONRenderer().render(payload)
+
+            for name, (renderer, parser) in implementations.items():
+                for operation, func in [
+                    ("render", lambda: renderer.render(payload)),
+                    ("parse", lambda: parser.parse(io.BytesIO(body))),
+                ]:
+                    summary = summarize(measure(func, options["repeat"]))
+                    summary.update(name=name, operation=operation, rows=rows, peak_bytes=peak_allocated(func))
+                    results.append(summary)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:>5} {result['operation']:>6} {result['rows']:>7} rows  "
+                f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                f"peak {result['peak_bytes'] / 1024:10,.0f} KiB"
+            )
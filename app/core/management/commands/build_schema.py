@@ -0,0 +1,33 @@
+"""
+Django command writing the OpenAPI schema artifacts served by /api/schema/
+"""
+import os
+
+from core import schema
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Render the schema to schema.yaml and schema.json for SCHEMA_ARTIFACT_DIR, e.g. when building the image"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", help="defaults to SCHEMA_ARTIFACT_DIR")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        directory = options["output_dir"] or settings.SCHEMA_ARTIFACT_DIR
+        if not directory:
+            raise CommandError("Pass --output-dir or set SCHEMA_ARTIFACT_DIR")
+        os.makedirs(directory, exist_ok=True)
+
+        for schema_format in schema.RENDERERS:
+            artifact = schema.SchemaArtifact(schema.render(schema_format))
+            path = schema.artifact_path(directory, schema_format)
+            # replaced atomically so running workers never read half a file
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(artifact.body)
+            os.replace(f"{path}.tmp", path)
+
+            self.stdout.write(f"{path} version {artifact.version[:12]} ({len(artifact.body):,} bytes)")
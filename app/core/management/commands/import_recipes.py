@@ -0,0 +1,169 @@
+"""
+Django command to bulk import recipes from NDJSON or CSV files
+"""
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from recipe.cache import invalidate_user_cache
+from recipe.serializers import RecipeSerializer
+from rest_framework.exceptions import ValidationError
+
+
+class Command(BaseCommand):
+    help = "Stream recipes from an NDJSON or CSV file (as produced by the export endpoint) into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON or CSV file to import")
+        parser.add_argument("--user", required=True, help="email of the user owning the imported recipes")
+        parser.add_argument("--format", choices=["ndjson", "csv"], help="defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=1000, help="rows validated and inserted at once")
+        parser.add_argument("--checkpoint", help="file recording progress, an interrupted import resumes from it")
+        parser.add_argument("--strict", action="store_true", help="abort on the first invalid row")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format not in ("ndjson", "csv"):
+            raise CommandError("Unable to detect file format, pass --format")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        checkpoint = options["checkpoint"]
+        source = self.file_identity(path)
+        done = self.read_checkpoint(checkpoint, source)
+        if done:
+            self.stdout.write(f"Resuming after {done} rows")
+
+        imported = skipped = 0
+        started = time.monotonic()
+
+        with open(path, newline="", encoding="utf-8") as file:
+            records = self.read_records(file, file_format)
+            for batch in self.batches(records, options["batch_size"], skip=done):
+                recipes, errors = self.validate(batch, user)
+
+                for line, error in errors:
+                    if options["strict"]:
+                        raise CommandError(f"Row {line}: {error}")
+                    self.stderr.write(f"Skipping row {line}: {error}")
+
+                with transaction.atomic():
+                    created = Recipe.objects.bulk_create(recipes, batch_size=options["batch_size"])
+                    # written before the commit, a resume checks whether the batch's last row made it
+                    pending = {"rows": done + len(batch), "last_id": created[-1].pk if created else None}
+                    self.write_checkpoint(checkpoint, source, done, pending)
+
+                imported += len(recipes)
+                skipped += len(errors)
+                done += len(batch)
+                self.write_checkpoint(checkpoint, source, done)
+
+                rate = imported / max(time.monotonic() - started, 1e-9)
+                self.stdout.write(f"Imported {imported} rows, skipped {skipped} ({rate:.0f} rows/s)")
+
+        invalidate_user_cache(user.pk)
+        self.stdout.write(self.style.SUCCESS(f"Import finished: {imported} imported, {skipped} skipped"))
+
+    def read_records(self, file, file_format: str) -> Iterator[Tuple[int, Dict]]:
+        """Yield (row number, record) pairs reading the file line by line"""
+
+        if file_format == "csv":
+            yield from enumerate(csv.DictReader(file), start=1)
+            return
+
+        row = 0
+        for text in file:
+            if not text.strip():
+                continue
+            row += 1
+            try:
+                yield row, json.loads(text)
+            except ValueError as error:
+                # keep the row so it is reported with the other invalid rows
+                yield row, {"__error__": f"invalid JSON ({error})"}
+
+    def batches(self, records: Iterator[Tuple[int, Dict]], size: int, skip: int) -> Iterator[List[Tuple[int, Dict]]]:
+        """Group records into lists of size, leaving out already imported ones"""
+
+        batch = []
+        for row, record in records:
+            if row <= skip:
+                continue
+            batch.append((row, record))
+            if len(batch) == size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def validate(self, batch: List[Tuple[int, Dict]], user) -> Tuple[List[Recipe], List[Tuple[int, str]]]:
+        """Validate batch with the API serializer returning recipes and row errors"""
+
+        serializer = RecipeSerializer()
+        recipes, errors = [], []
+
+        for row, record in batch:
+            if not isinstance(record, dict) or "__error__" in record:
+                errors.append((row, record.get("__error__") if isinstance(record, dict) else "expected an object"))
+                continue
+
+            try:
+                attrs = serializer.run_validation(record)
+            except ValidationError as error:
+                errors.append((row, json.dumps(error.detail)))
+                continue
+
+            recipes.append(Recipe(user=user, description=str(record.get("description") or ""), **attrs))
+
+        return recipes, errors
+
+    def file_identity(self, path: str) -> Dict:
+        """Path, size and modification time telling whether a checkpoint belongs to the file"""
+
+        stat = os.stat(path)
+        return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def read_checkpoint(self, checkpoint, source: Dict) -> int:
+        """Return number of rows already processed by a previous run"""
+
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+
+        with open(checkpoint, encoding="utf-8") as file:
+            state = json.load(file)
+        if {key: state.get(key) for key in source} != source:
+            raise CommandError(f"{checkpoint} belongs to another file or the file changed, remove it to start over")
+
+        pending = state.get("pending")
+        # ids aren't reused, the batch committed if its last recipe exists
+        if pending and (pending["last_id"] is None or Recipe.objects.filter(pk=pending["last_id"]).exists()):
+            return pending["rows"]
+        return state["rows"]
+
+    def write_checkpoint(self, checkpoint, source: Dict, rows: int, pending: Optional[Dict] = None) -> None:
+        """Atomically and durably record rows processed so far, and the batch being committed"""
+
+        if not checkpoint:
+            return
+
+        tmp_path = f"{checkpoint}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({**source, "rows": rows, "pending": pending}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, checkpoint)
@@ -0,0 +1,92 @@
+"""
+Django command load testing running API servers, e.g. the sync and async endpoints
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from core.benchmark import summarize
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent GET requests at one or more URLs and report throughput and latency percentiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=url to load, repeat to compare e.g. wsgi=http://localhost:8000/api/recipe/recipes/",
+        )
+        parser.add_argument("--token", help="API token sent in the Authorization header")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="parallel clients")
+        parser.add_argument("--requests", type=int, default=500, help="requests per target and concurrency level")
+        parser.add_argument("--timeout", type=float, default=10.0, help="seconds before a request is failed")
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        targets = self.parse_targets(options["target"])
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        results = []
+        for concurrency in options["concurrency"]:
+            for name, url in targets:
+                results.append(self.run(name, url, headers, concurrency, options["requests"], options["timeout"]))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:>8} c={result['concurrency']:<4} {result['rps']:9.1f} req/s  "
+                f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                f"errors {result['errors']}"
+            )
+
+    def parse_targets(self, values: List[str]) -> List[Tuple[str, str]]:
+        targets = []
+        for value in values:
+            name, sep, url = value.partition("=")
+            if not sep or not name or not url.startswith(("http://", "https://")):
+                raise CommandError(f"Invalid --target {value!r}, expected name=http://host/path")
+            targets.append((name, url))
+        return targets
+
+    def run(self, name: str, url: str, headers: Dict[str, str], concurrency: int, total: int, timeout: float) -> Dict:
+        """Send total requests using concurrency threads and summarize them"""
+
+        def fetch(_) -> Tuple[float, bool]:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as res:
+                    res.read()
+                    ok = res.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        # one untimed request so connection setup and caches don't skew the first samples
+        fetch(None)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        summary = summarize([duration for duration, _ in samples])
+        summary.update(
+            name=name,
+            concurrency=concurrency,
+            rps=total / elapsed,
+            errors=sum(not ok for _, ok in samples),
+        )
+        return summary
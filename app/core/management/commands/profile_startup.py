@@ -0,0 +1,146 @@
+"""
+Django command profiling how long a fresh worker takes to boot
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TARGETS = {"wsgi": "app.wsgi", "asgi": "app.asgi"}
+
+# loading the URLconf is part of the boot, the first request pays for it otherwise
+BOOT_CODE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "print(time.perf_counter() - started)"
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Modules from the stderr of python -X importtime, times in milliseconds
+
+    Modules loaded by importlib.import_module() itself, like the models and
+    admin modules of apps or urlconfs, aren't listed and their own time
+    counts towards the importer's. The modules they import with import
+    statements are, at depth 0 since their parent isn't, e.g. core.schema
+    imported by the urlconf.
+    """
+
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(
+                {
+                    "module": name,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                    # two spaces per level of nesting
+                    "depth": len(indent) // 2,
+                }
+            )
+
+    return modules
+
+
+def package_totals(modules: List[Dict]) -> Dict[str, float]:
+    """Self time summed per top level package, largest first"""
+
+    totals: Dict[str, float] = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + module["self_ms"]
+
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+class Command(BaseCommand):
+    help = "Boot app.wsgi or app.asgi in fresh interpreters, report the boot time and the most expensive imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", choices=TARGETS, default="wsgi")
+        parser.add_argument("--top", type=int, default=25, help="modules and packages listed")
+        parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative")
+        parser.add_argument("--repeat", type=int, default=5, help="timed boots, the median is reported")
+        profile = parser.add_mutually_exclusive_group()
+        profile.add_argument("--lean", action="store_true", help="boot with LEAN_STARTUP=1")
+        profile.add_argument("--compare", action="store_true", help="boot with and without LEAN_STARTUP")
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        if options["compare"]:
+            profiles = [False, True]
+        else:
+            profiles = [options["lean"] or settings.LEAN_STARTUP]
+        results = [self.profile(options["target"], lean, options["repeat"], options) for lean in profiles]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.write_result(result)
+        if options["compare"]:
+            full, lean = (result["boot_ms"] for result in results)
+            self.stdout.write(f"LEAN_STARTUP saves {full - lean:.1f} ms per boot ({(1 - lean / full) * 100:.1f}%)")
+
+    def run_boot(self, module: str, lean: bool, importtime: bool = False) -> subprocess.CompletedProcess:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+            "LEAN_STARTUP": "1" if lean else "0",
+        }
+        command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", BOOT_CODE.format(module=module)]
+        process = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if process.returncode:
+            errors = [line for line in process.stderr.splitlines() if not IMPORT_LINE.match(line)]
+            raise CommandError(f"Booting {module} failed:\n" + "\n".join(errors[-20:]))
+
+        return process
+
+    def profile(self, target: str, lean: bool, repeat: int, options: Dict) -> Dict:
+        module = TARGETS[target]
+        # first, so the timed boots find the bytecode cached like a deployed image
+        modules = parse_importtime(self.run_boot(module, lean, importtime=True).stderr)
+        # importtime slows imports down, boots are timed without it
+        boots = [float(self.run_boot(module, lean).stdout.splitlines()[-1]) * 1000 for _ in range(repeat)]
+
+        top = options["top"]
+        return {
+            "target": target,
+            "lean": lean,
+            "boot_ms": statistics.median(boots),
+            "boot_runs_ms": boots,
+            "modules_imported": len(modules),
+            "import_ms": sum(module["self_ms"] for module in modules),
+            "modules": sorted(modules, key=lambda module: -module[f"{options['sort']}_ms"])[:top],
+            "packages": dict(list(package_totals(modules).items())[:top]),
+        }
+
+    def write_result(self, result: Dict) -> None:
+        profile = "LEAN_STARTUP" if result["lean"] else "default"
+        self.stdout.write(
+            f"{result['target']} ({profile}): boot {result['boot_ms']:.1f} ms median of {len(result['boot_runs_ms'])}, "
+            f"{result['modules_imported']} modules imported in {result['import_ms']:.1f} ms under -X importtime"
+        )
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for module in result["modules"]:
+            self.stdout.write(f"{module['cumulative_ms']:14.1f} {module['self_ms']:9.1f}  {module['module']}")
+        self.stdout.write(f"{'self ms':>14}  package")
+        for package, self_ms in result["packages"].items():
+            self.stdout.write(f"{self_ms:14.1f}  {package}")
+        self.stdout.write("")
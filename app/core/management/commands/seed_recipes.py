@@ -0,0 +1,73 @@
+"""
+Django command generating synthetic users and recipes for scaling tests
+"""
+import time
+
+from core import seeding
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Create users with a skewed number of recipes each, e.g. --users 100000 --recipes 100 for 10M recipes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, required=True, help="users to create")
+        parser.add_argument("--recipes", type=float, required=True, help="mean recipes per user")
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=seeding.DEFAULT_SKEW,
+            help="Pareto shape of recipes per user, lower is more skewed, 0 for the same count everywhere",
+        )
+        parser.add_argument("--domain", default="seed.example.com", help="email domain of the generated users")
+        parser.add_argument("--password", default="seed-pass-123", help="password shared by every generated user")
+        parser.add_argument("--tokens", action="store_true", help="also create an API token per user")
+        parser.add_argument("--batch-size", type=int, default=5000, help="rows inserted per query")
+        parser.add_argument("--workers", type=int, default=1, help="threads inserting recipes on their own connections")
+        parser.add_argument("--seed", type=int, default=0, help="random seed, the same seed generates the same data")
+        parser.add_argument("--clear", action="store_true", help="delete users of the domain created by earlier runs")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        if min(options["users"], options["batch_size"], options["workers"]) < 1 or options["recipes"] < 0:
+            raise CommandError("--users, --batch-size and --workers must be positive and --recipes not negative")
+
+        domain = options["domain"]
+        if options["clear"]:
+            seeding.clear(domain)
+        elif get_user_model().objects.filter(email__endswith=f"@{domain}").exists():
+            raise CommandError(f"Users of {domain} exist already, pass --clear or another --domain")
+
+        started = time.monotonic()
+        reported = [started]
+
+        def progress(inserted: int, total: int) -> None:
+            now = time.monotonic()
+            if now - reported[0] >= 5 or inserted == total:
+                reported[0] = now
+                rate = inserted / max(now - started, 1e-9)
+                self.stdout.write(f"{inserted:,}/{total:,} recipes, {rate:,.0f}/s")
+
+        counts = seeding.seed(
+            options["users"],
+            options["recipes"],
+            domain,
+            options["password"],
+            skew=options["skew"],
+            batch_size=options["batch_size"],
+            tokens=options["tokens"],
+            random_seed=options["seed"],
+            workers=options["workers"],
+            progress=progress,
+        )
+
+        recipes = sorted((count for _, count in counts), reverse=True)
+        top = sum(recipes[: max(len(recipes) // 100, 1)])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(recipes):,} users and {sum(recipes):,} recipes in {time.monotonic() - started:.1f}s, "
+                f"top 1% of users own {top / max(sum(recipes), 1):.0%}, largest has {recipes[0]:,}"
+            )
+        )
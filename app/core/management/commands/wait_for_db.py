@@ -7,6 +7,9 @@ from django.core.management.base import BaseCommand
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2OpError
 
+# errors raised while the database isn't reachable (yet)
+DB_ERRORS = (Psycopg2OpError, OperationalError)
+
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
@@ -19,7 +22,7 @@ class Command(BaseCommand):
             try:
                 self.check(databases=["default"])  # type: ignore
                 db_up = True
-            except (Psycopg2OpError, OperationalError):
+            except DB_ERRORS:
                 self.stdout.write("Database unavailable waiting...")
                 time.sleep(1)
 
@@ -0,0 +1,188 @@
+"""Request metrics kept in process and rendered in the Prometheus text format
+
+Every worker process keeps its own histograms, scrape each worker (or
+sum them up) when running more than one.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.backends.postgresql_pool import pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+COMPRESSION_CPU_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COMPRESSION_RATIO_BUCKETS = (1, 1.5, 2, 3, 4, 6, 8, 12, 20)
+
+
+class RequestMetrics:
+    """Numbers collected while handling one request"""
+
+    __slots__ = ("queries", "db_time", "serialize_time", "serializing", "encoding", "compress_time", "compress_ratio")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        # set by the compression middleware for bodies it compressed up front
+        self.encoding = ""
+        self.compress_time = 0.0
+        self.compress_ratio = 0.0
+
+
+# set by the instrumentation middleware for the duration of a request
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper counting queries and DB time of the current request"""
+
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    """Add the time spent in the block to the request's serialization time
+
+    Queries run in the block, by lazy querysets or related fields, stay DB
+    time. Nested blocks, like nested serializers, are counted once.
+    """
+
+    metrics = current_request.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+
+    metrics.serializing = True
+    started, db_time = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_time += time.perf_counter() - started - (metrics.db_time - db_time)
+
+
+class Histogram:
+    """Cumulative histogram per label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            counts, total, count = self._series.get(labels) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._series[labels] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+
+        for labels, counts, total, count in sorted(series):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+LABELS = ("view", "method")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Total time spent handling the request.", LABELS, LATENCY_BUCKETS
+)
+db_duration = Histogram("http_request_db_seconds", "Time spent executing SQL per request.", LABELS, LATENCY_BUCKETS)
+serialize_duration = Histogram(
+    "http_request_serialization_seconds", "Time spent rendering the response body.", LABELS, LATENCY_BUCKETS
+)
+query_count = Histogram("http_request_queries", "SQL queries executed per request.", LABELS, QUERY_BUCKETS)
+
+COMPRESSION_LABELS = ("view", "encoding")
+
+compression_duration = Histogram(
+    "http_response_compression_cpu_seconds",
+    "CPU time spent compressing the response body.",
+    COMPRESSION_LABELS,
+    COMPRESSION_CPU_BUCKETS,
+)
+compression_ratio = Histogram(
+    "http_response_compression_ratio",
+    "Uncompressed over compressed response body size.",
+    COMPRESSION_LABELS,
+    COMPRESSION_RATIO_BUCKETS,
+)
+
+HISTOGRAMS = [request_duration, db_duration, serialize_duration, query_count, compression_duration, compression_ratio]
+
+
+def observe(labels: Tuple[str, ...], metrics: RequestMetrics, duration: float) -> None:
+    """Record a finished request"""
+
+    request_duration.observe(labels, duration)
+    db_duration.observe(labels, metrics.db_time)
+    serialize_duration.observe(labels, metrics.serialize_time)
+    query_count.observe(labels, metrics.queries)
+
+
+def observe_compression(labels: Tuple[str, ...], size: int, compressed_size: int, cpu_time: float) -> None:
+    """Record a compressed response body, streamed ones once they are sent"""
+
+    compression_duration.observe(labels, cpu_time)
+    compression_ratio.observe(labels, size / compressed_size)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    pool_stats = pool.stats()
+    gauges = [
+        ("db_pool_idle_connections", "gauge", "Idle connections kept by the pool.", "idle"),
+        ("db_pool_checkouts_total", "counter", "Connections requested from the pool.", "checkouts"),
+        ("db_pool_reused_total", "counter", "Connection requests served by an idle connection.", "reused"),
+        ("db_pool_discarded_total", "counter", "Pooled connections closed as unusable or surplus.", "discarded"),
+        ("db_pool_reuse_ratio", "gauge", "Share of connection requests served from the pool.", "reuse_rate"),
+    ]
+    for name, kind, documentation, key in gauges:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+        for pool_name, stats in sorted(pool_stats.items()):
+            lines.append(f'{name}{{pool="{_escape(pool_name)}"}} {stats[key]:g}')
+
+    return "\n".join(lines) + "\n"
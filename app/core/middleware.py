@@ -0,0 +1,250 @@
+"""Middleware shared by the apps"""
+
+import asyncio
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+from core import compression, metrics
+from core.exceptions import HashingUnavailable
+from core.hashers import HashingBusy
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    # connection_created fires again whenever a wrapper reconnects
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
+
+
+def install_query_recorders(**kwargs) -> None:
+    # request_started is sent from the thread running the request's sync
+    # code, which may hold connections opened before the middleware loaded
+    for connection in connections.all():
+        install_query_recorder(connection)
+
+
+class InstrumentationMiddleware:
+    """Record query count, DB, serialization and total time of every request
+
+    Times are sent back in a Server-Timing header and kept as histograms
+    per view for the metrics endpoint. Removed from the middleware chain
+    unless INSTRUMENTATION_ENABLED is set, so disabled it costs nothing.
+    Must be the first middleware to measure the whole request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not getattr(settings, "INSTRUMENTATION_ENABLED", False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        # async views run their queries in worker threads, the recorder
+        # reads the request's metrics from the context which follows them
+        connection_created.connect(install_query_recorder, dispatch_uid="core.instrumentation")
+        request_started.connect(install_query_recorders, dispatch_uid="core.instrumentation")
+        install_query_recorders()
+
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # tell Django to await __call__
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+
+        return self.finish(request, response, request_metrics, started)
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+
+        return self.finish(request, response, request_metrics, started)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns
+        started = time.perf_counter()
+
+        def rendered(response):
+            request_metrics = metrics.current_request.get()
+            if request_metrics is not None:
+                request_metrics.serialize_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, request_metrics: "metrics.RequestMetrics", started: float):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        labels = (match.view_name if match else "unmatched", request.method)
+        metrics.observe(labels, request_metrics, duration)
+
+        timings = [
+            f'db;dur={request_metrics.db_time * 1000:.2f};desc="{request_metrics.queries} queries"',
+            f"serialize;dur={request_metrics.serialize_time * 1000:.2f}",
+            f"total;dur={duration * 1000:.2f}",
+        ]
+        if request_metrics.encoding:
+            timings.insert(
+                2,
+                f"compress;dur={request_metrics.compress_time * 1000:.2f};"
+                f'desc="{request_metrics.encoding} {request_metrics.compress_ratio:.1f}x"',
+            )
+        response["Server-Timing"] = ", ".join(timings)
+        return response
+
+
+class CompressionMiddleware:
+    """Compress text responses with the best encoding the client accepts
+
+    gzip, and brotli and zstd when installed, preferred in the order of
+    COMPRESSION_ENCODINGS. Bodies smaller than COMPRESSION_MIN_SIZE bytes
+    are sent as they are, streamed bodies are compressed chunk by chunk
+    while they are sent. Responses already encoded, like the cached
+    schema, and HTML pages, which carry CSRF tokens, are left alone. With
+    instrumentation enabled the ratio and CPU time are kept as
+    histograms, and in Server-Timing unless streamed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not getattr(settings, "COMPRESSION_ENABLED", True):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        preferred = getattr(settings, "COMPRESSION_ENCODINGS", ["gzip"])
+        self.encodings = [encoding for encoding in preferred if encoding in compression.COMPRESSORS]
+
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        content_type = response.get("Content-Type", "")
+        if response.has_header("Content-Encoding") or not compression.is_compressible(content_type):
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # shared caches must keep a copy per encoding
+        patch_vary_headers(response, ["Accept-Encoding"])
+        encoding = compression.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.encodings)
+        if encoding is None:
+            return response
+
+        request_metrics = metrics.current_request.get()
+        match = request.resolver_match
+        # None unless instrumentation is enabled
+        labels = (match.view_name if match else "unmatched", encoding) if request_metrics is not None else None
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response.streaming_content, encoding, labels)
+            del response["Content-Length"]
+        else:
+            started = time.thread_time()
+            compressor = compression.COMPRESSORS[encoding]()
+            body = compressor.compress(response.content) + compressor.finish()
+            cpu_time = time.thread_time() - started
+            if len(body) >= len(response.content):
+                return response
+
+            if request_metrics is not None:
+                metrics.observe_compression(labels, len(response.content), len(body), cpu_time)
+                request_metrics.encoding = encoding
+                request_metrics.compress_time = cpu_time
+                request_metrics.compress_ratio = len(response.content) / len(body)
+            response.content = body
+            response["Content-Length"] = str(len(body))
+
+        # same content, other bytes, so no longer a strong match
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        response["Content-Encoding"] = encoding
+        return response
+
+    def compress_stream(
+        self, chunks: Iterable[bytes], encoding: str, labels: Optional[Tuple[str, ...]]
+    ) -> Iterator[bytes]:
+        """Compress chunks as they come
+
+        Every chunk is flushed, like Django's compress_sequence(), so the
+        client can decode each one when it arrives instead of waiting for
+        the compressor's buffer to fill.
+        """
+
+        compressor = compression.COMPRESSORS[encoding]()
+        size = compressed_size = 0
+        cpu_time = 0.0
+
+        for chunk in chunks:
+            started = time.thread_time()
+            data = compressor.compress(chunk) + compressor.flush()
+            cpu_time += time.thread_time() - started
+            size += len(chunk)
+            if data:
+                compressed_size += len(data)
+                yield data
+
+        started = time.thread_time()
+        data = compressor.finish()
+        cpu_time += time.thread_time() - started
+        compressed_size += len(data)
+        yield data
+
+        # the request finished long ago, only the histograms get these
+        if labels is not None:
+            metrics.observe_compression(labels, size, compressed_size, cpu_time)
+
+
+class HashingBusyMiddleware(MiddlewareMixin):
+    """Answer HashingBusy raised by views outside DRF with a 503
+
+    DRF views handle it in core.exceptions, this covers the admin login.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingBusy):
+            return None
+
+        response = HttpResponse(
+            str(HashingUnavailable.default_detail), content_type="text/plain", status=HashingUnavailable.status_code
+        )
+        response["Retry-After"] = str(HashingUnavailable.wait)
+        return response
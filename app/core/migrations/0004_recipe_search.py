@@ -0,0 +1,76 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:45
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, transaction
+
+# rows backfilled per transaction, each batch only locks its own rows
+BACKFILL_BATCH_SIZE = 5000
+
+# keeps search_vector in sync on every insert and title/description update
+SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, description ON core_recipe
+FOR EACH ROW EXECUTE PROCEDURE core_recipe_search_vector_update();
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER core_recipe_search_vector_trigger ON core_recipe;
+DROP FUNCTION core_recipe_search_vector_update();
+"""
+
+
+def backfill_search_vector(apps, schema_editor):
+    """Fill search_vector of existing rows through the trigger, in id ranges"""
+
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT max(id) FROM core_recipe")
+        max_id = cursor.fetchone()[0] or 0
+
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE core_recipe SET title = title WHERE id > %s AND id <= %s",
+                [start, start + BACKFILL_BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+
+    # the backfill commits batch by batch and concurrent index builds don't
+    # lock the table, neither can run in the migration's transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_recipe_user_id_desc_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='recipe_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
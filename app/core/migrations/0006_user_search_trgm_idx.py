@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:30
+
+from django.db import migrations
+
+# admin search runs icontains, i.e. UPPER(column) LIKE UPPER('%term%'),
+# which only an index on the same expression can serve, one statement
+# each as concurrent builds can't share an implicit transaction
+USER_SEARCH_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS core_user_email_upper_trgm_idx ON core_user "
+    "USING gin (UPPER(email) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS core_user_name_upper_trgm_idx ON core_user "
+    "USING gin (UPPER(name) gin_trgm_ops)",
+]
+
+DROP_USER_SEARCH_INDEXES = [
+    "DROP INDEX CONCURRENTLY IF EXISTS core_user_email_upper_trgm_idx",
+    "DROP INDEX CONCURRENTLY IF EXISTS core_user_name_upper_trgm_idx",
+]
+
+
+class Migration(migrations.Migration):
+
+    # concurrent index builds don't lock the table but can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_recipe_price_time_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(USER_SEARCH_INDEXES, DROP_USER_SEARCH_INDEXES),
+    ]
@@ -2,6 +2,8 @@ from typing import Union
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -58,6 +60,21 @@ class Recipe(models.Model):
     time_minutes = models.IntegerField()
     price = models.DecimalField(max_digits=5, decimal_places=2)
     link = models.CharField(max_length=255, blank=True)
+    # title and description lexemes, filled by a database trigger
+    # (migration 0004) so raw and bulk writes keep it up to date as well
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # serves per user listing ordered by newest first without a sort
+            models.Index(fields=["user", "-id"], name="recipe_user_id_desc_idx"),
+            # range filters and ordering on price/time, id breaks ties
+            models.Index(fields=["user", "price", "id"], name="recipe_user_price_idx"),
+            models.Index(fields=["user", "time_minutes", "id"], name="recipe_user_time_idx"),
+            # full text search and trigram (typo tolerant) title matching
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_idx"),
+            GinIndex(fields=["title"], name="recipe_title_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
 
     # also important for model display in django admin
     def __str__(self):
@@ -0,0 +1,151 @@
+"""OpenAPI schema rendered once per process and served from memory
+
+Introspecting every view and serializer takes long enough to matter on
+each request, yet the schema only changes when code is deployed. Each
+format (and language) is rendered on first use, or read from the files
+written by the build_schema command when SCHEMA_ARTIFACT_DIR is set,
+and kept with its gzipped body and ETag until the process exits.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class SchemaArtifact:
+    """Rendered schema with everything needed to serve it"""
+
+    __slots__ = ("body", "gzipped", "version", "etag", "gzip_etag")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        # mtime=0 keeps the compressed bytes identical between workers
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        self.version = hashlib.sha256(body).hexdigest()
+        # strong, the bytes only change along with the hash. The gzipped body
+        # is a different representation and needs a tag of its own
+        self.etag = quote_etag(self.version)
+        self.gzip_etag = quote_etag(f"{self.version}-gzip")
+
+
+_artifacts: Dict[Tuple[str, str], SchemaArtifact] = {}
+_lock = threading.Lock()
+
+
+def render(schema_format: str, lang: str = "") -> bytes:
+    """Generate the public schema and render it as yaml or json"""
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    if lang:
+        with translation.override(lang):
+            schema = generator.get_schema(request=None, public=True)
+    else:
+        schema = generator.get_schema(request=None, public=True)
+
+    return RENDERERS[schema_format]().render(schema, renderer_context={})
+
+
+def artifact_path(directory: str, schema_format: str) -> str:
+    return os.path.join(directory, f"schema.{schema_format}")
+
+
+def _load(schema_format: str, lang: str) -> bytes:
+    directory: Optional[str] = getattr(settings, "SCHEMA_ARTIFACT_DIR", "")
+    # artifacts are built in the default language only
+    if directory and not lang:
+        try:
+            with open(artifact_path(directory, schema_format), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+
+    return render(schema_format, lang)
+
+
+def schema_language(lang: str) -> str:
+    """Language of the ?lang= parameter to render in, "" for the default one
+
+    Codes outside LANGUAGES map to the default as well, so clients can't
+    make the process keep a schema for every string they come up with.
+    """
+
+    if not settings.USE_I18N or lang == settings.LANGUAGE_CODE or lang not in dict(settings.LANGUAGES):
+        return ""
+
+    return lang
+
+
+def get_artifact(schema_format: str, lang: str = "") -> SchemaArtifact:
+    """Schema of the format, rendered or loaded on the first call only"""
+
+    key = (schema_format, lang)
+    artifact = _artifacts.get(key)
+    if artifact is None:
+        # concurrent first requests wait for one rendering instead of each doing it
+        with _lock:
+            artifact = _artifacts.get(key)
+            if artifact is None:
+                artifact = _artifacts[key] = SchemaArtifact(_load(schema_format, lang))
+
+    return artifact
+
+
+def clear() -> None:
+    """Forget rendered schemas, the next request renders them again"""
+    _artifacts.clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving the schema rendered once per process
+
+    Responses carry a strong ETag, so clients revalidate with a 304, and
+    are sent gzipped, under an ETag of their own, when accepted. Schemas
+    that depend on the request, i.e. not public ones, and
+    SCHEMA_CACHE=False fall back to rendering every time.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        cacheable = self.serve_public and self.urlconf is None and self.api_version is None
+        if not getattr(settings, "SCHEMA_CACHE", True) or not cacheable:
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        schema_format = "json" if isinstance(renderer, OpenApiJsonRenderer) else "yaml"
+        lang = schema_language(request.GET.get("lang", ""))
+        artifact = get_artifact(schema_format, lang)
+        gzipped = bool(ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", "")))
+        etag = artifact.gzip_etag if gzipped else artifact.etag
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(artifact.body, content_type=content_type)
+            if gzipped:
+                response.content = artifact.gzipped
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        # stored but revalidated, which costs a 304 until the next deploy
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
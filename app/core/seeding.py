@@ -0,0 +1,148 @@
+"""Synthetic users and recipes for benchmarks and scaling tests
+
+Recipe counts per user follow a Pareto distribution, so like real data a
+few heavy users own most recipes while most users only have a handful.
+Rows are generated lazily and inserted with bulk_create in batches, and
+every user shares one password hashed up front, so memory stays flat
+and seeding millions of recipes is bound by the database, not Python.
+"""
+
+import itertools
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+# shape of an 80/20 split, 0 gives every user the same amount
+DEFAULT_SKEW = 1.16
+
+ADJECTIVES = ["Spicy", "Creamy", "Quick", "Smoky", "Crispy", "Zesty", "Hearty", "Sweet", "Tangy", "Rustic"]
+DISHES = ["Chicken", "Tofu", "Lentil", "Salmon", "Mushroom", "Beef", "Chickpea", "Pumpkin", "Shrimp", "Eggplant"]
+STYLES = ["Curry", "Stew", "Salad", "Tacos", "Risotto", "Soup", "Pasta", "Bowl", "Skewers", "Pie"]
+WORDS = ["slowly", "simmer", "onions", "garlic", "until", "golden", "season", "with", "fresh", "herbs", "serve", "warm"]
+
+
+def recipe_counts(users: int, mean: float, skew: float, rng: random.Random) -> List[int]:
+    """Recipes per user adding up to users * mean"""
+
+    if skew <= 0:
+        weights = [1.0] * users
+    else:
+        weights = [rng.paretovariate(skew) for _ in range(users)]
+
+    total = round(users * mean)
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # hand out what rounding down lost to the largest remainders
+    remainders = sorted(range(users), key=lambda i: weights[i] * scale - counts[i], reverse=True)
+    for i in remainders[: total - sum(counts)]:
+        counts[i] += 1
+
+    return counts
+
+
+def generate_recipes(users: Iterable[Tuple[int, int]], rng: random.Random) -> Iterator[Recipe]:
+    """Recipes for (user id, count) pairs"""
+
+    for user_id, count in users:
+        for _ in range(count):
+            # descriptions from empty to a few hundred words, mostly short
+            words = min(int(rng.expovariate(1 / 40)), 400)
+            yield Recipe(
+                user_id=user_id,
+                title=f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} {rng.choice(STYLES)}",
+                description=" ".join(rng.choice(WORDS) for _ in range(words)),
+                time_minutes=rng.randint(5, 240),
+                price=Decimal(rng.randint(100, 99999)) / 100,
+                link="https://example.com/recipe.pdf" if rng.random() < 0.3 else "",
+            )
+
+
+def batches(objects: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(objects)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def seed(
+    users: int,
+    recipes_per_user: float,
+    domain: str,
+    password: str,
+    skew: float = DEFAULT_SKEW,
+    batch_size: int = 5000,
+    tokens: bool = False,
+    random_seed: int = 0,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Tuple[int, int]]:
+    """Create users user<n>@domain with their recipes, return (user id, recipe count) pairs
+
+    progress is called with the recipes inserted so far and the total.
+    With several workers the users must be committed before calling,
+    e.g. outside of a transaction.
+    """
+
+    rng = random.Random(random_seed)
+    counts = recipe_counts(users, recipes_per_user, skew, rng)
+    total = sum(counts)
+    # verifying still works, only the hashing cost is paid once
+    password_hash = make_password(password)
+
+    user_ids: List[int] = []
+    User = get_user_model()
+    for batch in batches(range(users), batch_size):
+        created = User.objects.bulk_create(
+            User(email=f"user{i}@{domain}", name=f"User {i}", password=password_hash) for i in batch
+        )
+        user_ids.extend(user.pk for user in created)
+
+    if tokens:
+        for batch in batches(user_ids, batch_size):
+            Token.objects.bulk_create(Token(key=Token.generate_key(), user_id=user_id) for user_id in batch)
+
+    pairs = list(zip(user_ids, counts))
+    inserted = 0
+    lock = threading.Lock()
+
+    def insert(worker: int) -> None:
+        nonlocal inserted
+        # each worker has its own generator so the data only depends on the seed and worker count
+        worker_rng = random.Random(random_seed * 1000 + worker)
+        try:
+            for batch in batches(generate_recipes(pairs[worker::workers], worker_rng), batch_size):
+                Recipe.objects.bulk_create(batch)
+                with lock:
+                    inserted += len(batch)
+                    if progress:
+                        progress(inserted, total)
+        finally:
+            if workers > 1:
+                connection.close()
+
+    if workers > 1:
+        # threads insert over their own connections, index and trigger work runs in parallel
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(insert, range(workers)))
+    else:
+        insert(0)
+
+    return pairs
+
+
+def clear(domain: str) -> None:
+    """Delete users of the domain along with their recipes and tokens"""
+
+    # recipes have no dependents, so this is a single DELETE unlike the cascade
+    Recipe.objects.filter(user__email__endswith=f"@{domain}").delete()
+    get_user_model().objects.filter(email__endswith=f"@{domain}").delete()
@@ -0,0 +1,28 @@
+"""Serializer helpers shared by the APIs"""
+
+from typing import Optional, Sequence
+
+from core.metrics import measure_serialization
+
+
+class DynamicFieldsMixin:
+    """Serializer taking a fields argument that limits the fields it renders"""
+
+    def __init__(self, *args, fields: Optional[Sequence[str]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):  # type: ignore
+                self.fields.pop(name)  # type: ignore
+
+
+class MeasuredSerializerMixin:
+    """Serializer counting its field conversion towards the request's serialization time
+
+    DRF renders JSON after the view returns, the field dispatch of
+    serializer.data happens inside the view and is the larger part.
+    """
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)  # type: ignore
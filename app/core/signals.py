@@ -0,0 +1,21 @@
+"""Signal handlers keeping core caches in sync with the database"""
+
+from core.authentication import invalidate_token, invalidate_user_tokens
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Deleted tokens must stop authenticating right away"""
+    invalidate_token(instance.key)
+
+
+# covers deactivation and UserSerializer.update, both end in user.save()
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    """Cached users must never be staler than the database"""
+    invalidate_user_tokens(instance.pk)
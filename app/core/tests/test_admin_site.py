@@ -1,10 +1,27 @@
 """Tests for django admin modifications"""
 
+from unittest.mock import call, patch
+
+from core.admin import RecipeAdmin
+from core.models import Recipe
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
+def table_statistics(reltuples: int):
+    """Execute wrapper answering the row estimate query as if the table was analyzed"""
+
+    def wrapper(execute, sql, params, many, context):
+        if "reltuples" in sql:
+            return execute("SELECT %s::real", [reltuples], many, context)
+        return execute(sql, params, many, context)
+
+    return wrapper
+
+
 class AdminSiteTests(TestCase):
     def setUp(self) -> None:
         """Create user and client"""
@@ -43,3 +60,125 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class ScalableAdminTests(TestCase):
+    def setUp(self) -> None:
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(  # type: ignore
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_login(self.admin_user)
+        self.recipes = [
+            Recipe.objects.create(
+                user=get_user_model().objects.create_user(f"user{i}@example.com", "testpass123"),  # type: ignore
+                title=f"Lentil soup {i}",
+                time_minutes=10,
+                price="5.00",
+            )
+            for i in range(3)
+        ]
+
+    def test_recipes_list_queries_constant(self) -> None:
+        """Test recipe owners are loaded with the recipes, not per row"""
+
+        url = reverse("admin:core_recipe_changelist")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        for i in range(3, 8):
+            Recipe.objects.create(user=self.admin_user, title=f"Recipe {i}", time_minutes=10, price="5.00")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(url)
+
+        self.assertContains(res, "user0@example.com")
+        self.assertEqual(len(many), len(few))
+
+    @patch("core.admin.EXACT_COUNT_LIMIT", 0)
+    def test_users_count_estimated(self) -> None:
+        """Test large tables are counted from statistics instead of COUNT(*)"""
+
+        # ANALYZE would leave statistics behind for the tests after this one
+        with connection.execute_wrapper(table_statistics(5000)), CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("admin:core_user_changelist"))
+
+        self.assertContains(res, "Counts are estimated")
+        self.assertContains(res, "5000 users")
+        self.assertFalse([query for query in queries if "COUNT(*)" in query["sql"]])
+
+    @patch("core.admin.EXACT_COUNT_LIMIT", 0)
+    def test_filtered_count_estimated(self) -> None:
+        """Test filtered counts use the query plan's estimate"""
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("admin:core_recipe_changelist"), {"q": "lentil"})
+
+        self.assertContains(res, "Counts are estimated")
+        self.assertTrue([query for query in queries if query["sql"].startswith("EXPLAIN")])
+        self.assertFalse([query for query in queries if "COUNT(*)" in query["sql"]])
+
+    def test_small_tables_counted_exactly(self) -> None:
+        """Test exact counts are kept below the estimate limit"""
+
+        res = self.client.get(reverse("admin:core_recipe_changelist"))
+
+        self.assertContains(res, "3 recipes")
+        self.assertNotContains(res, "Counts are estimated")
+
+    @patch.object(RecipeAdmin, "list_per_page", 2)
+    def test_recipes_keyset_navigation(self) -> None:
+        """Test the next page is linked by the last id shown"""
+
+        url = reverse("admin:core_recipe_changelist")
+        res = self.client.get(url)
+
+        next_url = f"?id__lt={self.recipes[1].id}"
+        self.assertContains(res, f'href="{next_url}"')
+        res = self.client.get(url + next_url)
+        self.assertContains(res, self.recipes[0].title)
+        self.assertNotContains(res, self.recipes[2].title)
+        # last page
+        self.assertNotContains(res, "keyset-next")
+
+    def test_recipes_search(self) -> None:
+        """Test recipes are found by their indexed search vector and owner"""
+
+        Recipe.objects.create(user=self.admin_user, title="Chickpea curry", time_minutes=10, price="5.00")
+        url = reverse("admin:core_recipe_changelist")
+
+        res = self.client.get(url, {"q": "curry"})
+        self.assertContains(res, "Chickpea curry")
+        self.assertNotContains(res, "Lentil soup")
+
+        res = self.client.get(url, {"q": "USER1@example.com"})
+        self.assertContains(res, "Lentil soup 1")
+        self.assertNotContains(res, "Lentil soup 2")
+
+    def test_users_search_uses_index(self) -> None:
+        """Test user search by email fragment is served by the trigram index"""
+
+        res = self.client.get(reverse("admin:core_user_changelist"), {"q": "user2"})
+
+        self.assertContains(res, "user2@example.com")
+        self.assertNotContains(res, "user1@example.com")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = get_user_model().objects.filter(email__icontains="user2").explain()
+        self.assertIn("core_user_email_upper_trgm_idx", plan)
+
+    @patch("core.admin.invalidate_user_cache")
+    def test_recipe_change_invalidates_cache(self, patched_invalidate) -> None:
+        """Test admin writes invalidate cached API responses of the old and new owner"""
+
+        recipe = self.recipes[0]
+        payload = {"user": self.admin_user.id, "title": "Changed", "time_minutes": 10, "price": "5.00"}
+        res = self.client.post(reverse("admin:core_recipe_change", args=[recipe.id]), payload)
+
+        self.assertEqual(res.status_code, 302)
+        patched_invalidate.assert_has_calls([call(self.admin_user.id), call(recipe.user_id)])
+
+        patched_invalidate.reset_mock()
+        payload = {"action": "delete_selected", "_selected_action": [self.recipes[1].id], "post": "yes"}
+        self.client.post(reverse("admin:core_recipe_changelist"), payload)
+
+        patched_invalidate.assert_called_once_with(self.recipes[1].user_id)
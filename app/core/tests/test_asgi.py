@@ -0,0 +1,39 @@
+"""
+Tests for the ASGI application wrapper
+"""
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from core.asgi import thread_per_request
+from django.test import SimpleTestCase
+
+
+class ThreadPerRequestTests(SimpleTestCase):
+    def test_requests_run_in_parallel(self) -> None:
+        """Test sync code of concurrent requests runs on a thread per request"""
+
+        threads = []
+
+        def blocking_read():
+            time.sleep(0.2)
+            return threading.get_ident()
+
+        async def application(scope, receive, send):
+            # two calls of one request share its thread
+            threads.append((await sync_to_async(blocking_read)(), await sync_to_async(threading.get_ident)()))
+
+        app = thread_per_request(application)
+
+        async def serve():
+            await asyncio.gather(*(app({"type": "http"}, None, None) for _ in range(4)))
+
+        started = time.perf_counter()
+        asyncio.run(serve())
+        elapsed = time.perf_counter() - started
+
+        # 0.8s or more one after another on a single thread
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(all(first == second for first, second in threads))
+        self.assertEqual(len({first for first, _ in threads}), 4)
@@ -0,0 +1,100 @@
+"""Tests for cached token authentication"""
+
+from unittest.mock import patch
+
+from core.authentication import token_cache
+from core.cache import TTLCache
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+ME_URL = reverse("user:me")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self) -> None:
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(  # type: ignore
+            email="user@example.com", password="testpass123", name="Test Name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_lookup_cached(self) -> None:
+        """Test authenticated requests skip the token query once cached"""
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)  # type: ignore
+
+    def test_deleted_token_rejected(self) -> None:
+        """Test deleting a token evicts it from the cache"""
+
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self) -> None:
+        """Test deactivating a user evicts their tokens from the cache"""
+
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_not_stale(self) -> None:
+        """Test updating profile is reflected on the next request"""
+
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"name": "New name"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "New name")  # type: ignore
+
+
+class TTLCacheTests(SimpleTestCase):
+    """Test the bounded in process cache"""
+
+    def test_least_recently_used_evicted(self) -> None:
+        """Test oldest untouched entry is dropped when full"""
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    @patch("core.cache.time.monotonic")
+    def test_entries_expire(self, patched_monotonic) -> None:
+        """Test entries are gone once their ttl passed"""
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        patched_monotonic.return_value = 100
+        cache.set("a", 1)
+
+        patched_monotonic.return_value = 159
+        self.assertEqual(cache.get("a"), 1)
+        patched_monotonic.return_value = 161
+        self.assertIsNone(cache.get("a"))
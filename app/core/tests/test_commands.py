@@ -1,12 +1,26 @@
 """
 Test custom django management commands
 """
+import json
+import os
+import random
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from core import seeding
+from core.management.commands import import_recipes
+from core.management.commands.benchmark_api import SCENARIOS
+from core.management.commands.profile_startup import parse_importtime
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from psycopg2 import OperationalError as Psycopg2Error
+from rest_framework.authtoken.models import Token
 
 
 # mocking check method provided by BaseCommand in wait_for_db.py
@@ -41,3 +55,322 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test bulk importing recipes from files"""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write_file(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def import_recipes(self, path: str, *args) -> str:
+        out = StringIO()
+        call_command("import_recipes", path, "--user", self.user.email, *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_import_ndjson(self) -> None:
+        """Test NDJSON rows are imported in batches for the user"""
+
+        rows = [{"title": f"Recipe {i}", "time_minutes": 5, "price": "1.50", "description": "Tasty"} for i in range(5)]
+        path = self.write_file("recipes.ndjson", "\n".join(json.dumps(row) for row in rows))
+
+        out = self.import_recipes(path, "--batch-size", "2")
+
+        recipes = Recipe.objects.filter(user=self.user).order_by("id")
+        self.assertEqual([recipe.title for recipe in recipes], [row["title"] for row in rows])
+        self.assertEqual(recipes[0].description, "Tasty")
+        self.assertIn("Imported 4 rows", out)
+        self.assertIn("5 imported, 0 skipped", out)
+
+    def test_import_csv(self) -> None:
+        """Test CSV files in the export layout are imported"""
+
+        path = self.write_file(
+            "recipes.csv",
+            "id,title,description,time_minutes,price,link\n"
+            "7,Soup,Warm,30,4.20,https://example.com\n",
+        )
+
+        self.import_recipes(path)
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.title, "Soup")
+        self.assertEqual(recipe.time_minutes, 30)
+        self.assertEqual(str(recipe.price), "4.20")
+
+    def test_import_skips_invalid_rows(self) -> None:
+        """Test invalid rows are skipped and strict mode aborts"""
+
+        path = self.write_file(
+            "recipes.ndjson",
+            '{"title": "Good", "time_minutes": 5, "price": "1.50"}\n'
+            '{"title": "Bad", "price": "1.50"}\n'
+            "not json\n",
+        )
+
+        out = self.import_recipes(path)
+
+        self.assertEqual(list(Recipe.objects.values_list("title", flat=True)), ["Good"])
+        self.assertIn("skipped 2", out)
+        with self.assertRaises(CommandError):
+            self.import_recipes(path, "--strict")
+
+    def write_checkpoint(self, path: str, **state) -> str:
+        source = import_recipes.Command().file_identity(path)
+        return self.write_file("import.checkpoint", json.dumps({**source, **state}))
+
+    def test_import_resumes_from_checkpoint(self) -> None:
+        """Test rows recorded in the checkpoint are not imported again"""
+
+        rows = [{"title": f"Recipe {i}", "time_minutes": 5, "price": "1.50"} for i in range(3)]
+        path = self.write_file("recipes.ndjson", "\n".join(json.dumps(row) for row in rows))
+        checkpoint = self.write_checkpoint(path, rows=2)
+
+        self.import_recipes(path, "--checkpoint", checkpoint)
+
+        self.assertEqual(list(Recipe.objects.values_list("title", flat=True)), ["Recipe 2"])
+        with open(checkpoint, encoding="utf-8") as file:
+            state = json.load(file)
+        self.assertEqual((state["rows"], state["pending"], state["path"]), (3, None, os.path.abspath(path)))
+
+    def test_import_resumes_pending_batch(self) -> None:
+        """Test a batch interrupted around its commit is imported once"""
+
+        rows = [{"title": f"Recipe {i}", "time_minutes": 5, "price": "1.50"} for i in range(3)]
+        path = self.write_file("recipes.ndjson", "\n".join(json.dumps(row) for row in rows))
+
+        # crashed before the commit, the batch's last recipe never made it
+        checkpoint = self.write_checkpoint(path, rows=0, pending={"rows": 2, "last_id": 10**9})
+        self.import_recipes(path, "--checkpoint", checkpoint)
+        self.assertEqual(Recipe.objects.count(), 3)
+
+        # crashed after the commit, before the checkpoint was updated
+        Recipe.objects.all().delete()
+        committed = Recipe.objects.create(user=self.user, title="Recipe 1", time_minutes=5, price="1.50")
+        checkpoint = self.write_checkpoint(path, rows=0, pending={"rows": 2, "last_id": committed.pk})
+        self.import_recipes(path, "--checkpoint", checkpoint)
+        self.assertEqual(list(Recipe.objects.order_by("id").values_list("title", flat=True)), ["Recipe 1", "Recipe 2"])
+
+    def test_import_checkpoint_of_other_file(self) -> None:
+        """Test a checkpoint is refused for another or a changed file"""
+
+        path = self.write_file("recipes.ndjson", '{"title": "Soup", "time_minutes": 5, "price": "1.50"}\n')
+        other = self.write_file("other.ndjson", "")
+        checkpoint = self.write_checkpoint(other, rows=1)
+
+        with self.assertRaises(CommandError):
+            self.import_recipes(path, "--checkpoint", checkpoint)
+
+        checkpoint = self.write_checkpoint(path, rows=1)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write('{"title": "Stew", "time_minutes": 5, "price": "1.50"}\n')
+        with self.assertRaises(CommandError):
+            self.import_recipes(path, "--checkpoint", checkpoint)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_import_unknown_user_error(self) -> None:
+        """Test importing for a missing user fails"""
+
+        path = self.write_file("recipes.ndjson", "")
+
+        with self.assertRaises(CommandError):
+            call_command("import_recipes", path, "--user", "missing@example.com")
+
+
+class SeedRecipesCommandTests(TestCase):
+    def test_recipe_counts(self) -> None:
+        """Test counts add up to the requested mean and are skewed"""
+
+        counts = seeding.recipe_counts(100, 10, seeding.DEFAULT_SKEW, random.Random(0))
+
+        self.assertEqual(sum(counts), 1000)
+        self.assertGreater(max(counts), 10 * min(counts) + 10)
+        self.assertEqual(seeding.recipe_counts(4, 2.5, 0, random.Random(0)), [3, 3, 2, 2])
+
+    def test_seed_recipes(self) -> None:
+        """Test users with tokens and recipes are created, sharing one password hash"""
+
+        options = ["--users", "20", "--recipes", "5", "--tokens", "--batch-size", "7"]
+        call_command("seed_recipes", *options, stdout=StringIO())
+
+        users = get_user_model().objects.filter(email__endswith="@seed.example.com")
+        self.assertEqual(users.count(), 20)
+        self.assertEqual(Recipe.objects.filter(user__in=users).count(), 100)
+        self.assertEqual(Token.objects.filter(user__in=users).count(), 20)
+        self.assertEqual(len(set(users.values_list("password", flat=True))), 1)
+        self.assertTrue(users.get(email="user0@seed.example.com").check_password("seed-pass-123"))
+
+    def test_seed_recipes_existing_domain(self) -> None:
+        """Test seeding the same domain again requires --clear"""
+
+        call_command("seed_recipes", "--users", "2", "--recipes", "1", stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command("seed_recipes", "--users", "2", "--recipes", "1", stdout=StringIO())
+
+        call_command("seed_recipes", "--users", "3", "--recipes", "1", "--clear", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 3)
+
+
+class SeedRecipesWorkersTests(TransactionTestCase):
+    def test_seed_recipes_workers(self) -> None:
+        """Test workers insert every recipe over their own connections"""
+
+        call_command("seed_recipes", "--users", "10", "--recipes", "4", "--workers", "3", stdout=StringIO())
+
+        self.assertEqual(Recipe.objects.count(), 40)
+
+
+class BenchmarkRenderersCommandTests(SimpleTestCase):
+    def test_benchmark_renderers(self) -> None:
+        """Test benchmark reports render and parse results of both implementations"""
+
+        out = StringIO()
+
+        call_command("benchmark_renderers", "--rows", "10", "--repeat", "1", "--json", stdout=out)
+
+        results = json.loads(out.getvalue())
+        self.assertEqual(
+            {(result["name"], result["operation"]) for result in results},
+            {("drf", "render"), ("drf", "parse"), ("fast", "render"), ("fast", "parse")},
+        )
+
+
+class LoadTestCommandTests(SimpleTestCase):
+    def test_loadtest(self) -> None:
+        """Test load test reports every target and concurrency level"""
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                status = 200 if self.headers["Authorization"] == "Token abc" else 401
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_port}/"
+
+        out = StringIO()
+        call_command(
+            "loadtest",
+            "--target",
+            f"wsgi={url}",
+            "--target",
+            f"asgi={url}async/",
+            "--token",
+            "abc",
+            "--concurrency",
+            "1",
+            "2",
+            "--requests",
+            "4",
+            "--json",
+            stdout=out,
+        )
+
+        results = json.loads(out.getvalue())
+        self.assertEqual(
+            {(result["name"], result["concurrency"]) for result in results},
+            {("wsgi", 1), ("asgi", 1), ("wsgi", 2), ("asgi", 2)},
+        )
+        self.assertTrue(all(result["runs"] == 4 and result["errors"] == 0 for result in results))
+
+    def test_loadtest_invalid_target(self) -> None:
+        """Test targets must be given as name=url"""
+
+        with self.assertRaises(CommandError):
+            call_command("loadtest", "--target", "localhost:8000", stdout=StringIO())
+
+
+@override_settings(ALLOWED_HOSTS=["localhost"])
+class BenchmarkAPICommandTests(TransactionTestCase):
+    def test_benchmark_api(self) -> None:
+        """Test benchmark covers every scenario without errors and removes its data"""
+
+        out = StringIO()
+
+        options = ["--users", "2", "--recipes", "3", "--concurrency", "2", "--requests", "2", "--json"]
+        call_command("benchmark_api", *options, stdout=out)
+
+        results = json.loads(out.getvalue())
+        self.assertEqual([result["scenario"] for result in results], SCENARIOS)
+        self.assertTrue(all(result["runs"] == 2 and result["errors"] == 0 for result in results))
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_api_baseline(self) -> None:
+        """Test results are compared to a baseline run"""
+
+        options = ["--users", "1", "--recipes", "2", "--concurrency", "1", "--requests", "2", "--scenarios", "user-me"]
+        out = StringIO()
+        call_command("benchmark_api", *options, "--json", stdout=out)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            f.write(out.getvalue())
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command("benchmark_api", *options, "--baseline", f.name, stdout=out)
+
+        self.assertIn("vs baseline", out.getvalue())
+
+
+class ProfileStartupCommandTests(SimpleTestCase):
+    def test_parse_importtime(self) -> None:
+        """Test modules are read from the importtime output"""
+
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   django.utils\n"
+            "import time:      2500 |       2620 | django\n"
+            "other output\n"
+        )
+
+        self.assertEqual(
+            parse_importtime(output),
+            [
+                {"module": "django.utils", "self_ms": 0.12, "cumulative_ms": 0.12, "depth": 1},
+                {"module": "django", "self_ms": 2.5, "cumulative_ms": 2.62, "depth": 0},
+            ],
+        )
+
+    def test_profile_startup(self) -> None:
+        """Test the boot is timed and its imports reported"""
+
+        out = StringIO()
+
+        call_command("profile_startup", "--repeat", "1", "--top", "5", "--json", stdout=out)
+
+        [result] = json.loads(out.getvalue())
+        self.assertEqual(result["target"], "wsgi")
+        self.assertGreater(result["boot_ms"], 0)
+        self.assertEqual(len(result["modules"]), 5)
+        # everything is imported by the WSGI module
+        self.assertEqual(result["modules"][0]["module"], "app.wsgi")
+        self.assertIn("django", result["packages"])
+
+    def test_profile_startup_lean(self) -> None:
+        """Test LEAN_STARTUP boots without the admin forms and schema views"""
+
+        out = StringIO()
+
+        call_command("profile_startup", "--compare", "--repeat", "1", "--top", "100000", "--json", stdout=out)
+
+        full, lean = ({module["module"] for module in result["modules"]} for result in json.loads(out.getvalue()))
+        for module in ("core.schema", "django.contrib.auth.forms", "drf_spectacular.views"):
+            self.assertIn(module, full)
+            self.assertNotIn(module, lean)
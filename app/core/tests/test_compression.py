@@ -0,0 +1,175 @@
+"""
+Tests for response compression
+"""
+import gzip
+import json
+import os
+import zlib
+from unittest.mock import patch
+
+from core import compression, metrics
+from core.middleware import CompressionMiddleware
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+EXPORT_URL = reverse("recipe:recipe-export")
+METRICS_URL = reverse("metrics")
+
+BODY = json.dumps([{"id": i, "title": f"Recipe {i}", "description": "Sample description"} for i in range(100)])
+
+
+class NegotiateTests(SimpleTestCase):
+    def test_negotiate(self) -> None:
+        """Test the encoding follows q-values, then the preferred order"""
+
+        with patch.dict(compression.COMPRESSORS, {"br": object}):
+            cases = [
+                ("gzip, deflate, br", "br"),
+                ("gzip;q=1.0, br;q=0.5", "gzip"),
+                ("br;q=0, gzip", "gzip"),
+                ("*", "br"),
+                ("*;q=0.5, gzip;q=0.8", "gzip"),
+                ("identity", None),
+                ("gzip;q=0", None),
+                ("", None),
+            ]
+            for accept_encoding, expected in cases:
+                with self.subTest(accept_encoding):
+                    self.assertEqual(compression.negotiate(accept_encoding, ["zstd", "br", "gzip"]), expected)
+
+    def test_negotiate_not_installed(self) -> None:
+        """Test encodings of packages not installed are skipped"""
+
+        with patch.dict(compression.COMPRESSORS, {"br": object}):
+            compression.COMPRESSORS.pop("zstd", None)
+
+            self.assertEqual(compression.negotiate("zstd, gzip", ["zstd", "gzip"]), "gzip")
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024, COMPRESSION_ENCODINGS=["gzip"])
+class CompressionMiddlewareTests(SimpleTestCase):
+    def compress(self, response, accept_encoding: str = "gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compress(self) -> None:
+        """Test large text bodies are compressed"""
+
+        response = HttpResponse(BODY, content_type="application/json")
+        response["ETag"] = '"v1"'
+
+        res = self.compress(response)
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content).decode(), BODY)
+        self.assertEqual(res["Content-Length"], str(len(res.content)))
+        self.assertEqual(res["ETag"], 'W/"v1"')
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    def test_not_accepted(self) -> None:
+        """Test bodies stay as they are for clients not taking an encoding"""
+
+        res = self.compress(HttpResponse(BODY, content_type="application/json"), accept_encoding="")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertEqual(res.content.decode(), BODY)
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    def test_skipped(self) -> None:
+        """Test small, binary, HTML and already encoded bodies are skipped"""
+
+        encoded = HttpResponse(BODY, content_type="application/json")
+        encoded["Content-Encoding"] = "br"
+        no_transform = HttpResponse(BODY, content_type="application/json")
+        no_transform["Cache-Control"] = "no-transform"
+        responses = [
+            HttpResponse("{}", content_type="application/json"),
+            HttpResponse(os.urandom(2048), content_type="image/png"),
+            HttpResponse("<p>page</p>" * 200, content_type="text/html; charset=utf-8"),
+            encoded,
+            no_transform,
+        ]
+
+        for response in responses:
+            with self.subTest(response["Content-Type"]):
+                res = self.compress(response)
+                self.assertNotEqual(res.get("Content-Encoding"), "gzip")
+                self.assertFalse(res.has_header("Vary"))
+
+    def test_compress_streaming(self) -> None:
+        """Test streamed bodies are compressed and flushed chunk by chunk"""
+
+        chunks = [os.urandom(32 * 1024).hex().encode() for _ in range(8)]
+        consumed = []
+
+        def produce():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        res = self.compress(StreamingHttpResponse(produce(), content_type="application/x-ndjson"))
+        stream = iter(res.streaming_content)
+        first = next(stream)
+
+        self.assertEqual(len(consumed), 1)
+        # flushed, the client can decode the first chunk already
+        self.assertEqual(zlib.decompressobj(31).decompress(first), chunks[0])
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertFalse(res.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(first + b"".join(stream)), b"".join(chunks))
+
+    @override_settings(COMPRESSION_ENABLED=False)
+    def test_not_used_when_disabled(self) -> None:
+        """Test middleware takes itself out of the chain when disabled"""
+
+        with self.assertRaises(MiddlewareNotUsed):
+            CompressionMiddleware(lambda request: HttpResponse())
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, COMPRESSION_MIN_SIZE=1024, COMPRESSION_ENCODINGS=["gzip"])
+class CompressionInstrumentationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        for i in range(30):
+            Recipe.objects.create(
+                user=self.user, title=f"Recipe {i}", description="Sample description", time_minutes=5, price="5.00"
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing(self) -> None:
+        """Test compression time and ratio are reported and recorded"""
+
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))), 30)
+        self.assertRegex(res["Server-Timing"], r'compress;dur=[0-9.]+;desc="gzip [0-9.]+x"')
+        body = self.client.get(METRICS_URL).content.decode()
+        self.assertIn('http_response_compression_ratio_count{view="recipe:recipe-list",encoding="gzip"} 1', body)
+        self.assertIn("# TYPE http_response_compression_cpu_seconds histogram", body)
+
+    def test_streaming_recorded(self) -> None:
+        """Test streamed exports are recorded once sent"""
+
+        plain = b"".join(self.client.get(EXPORT_URL).streaming_content)  # type: ignore
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(metrics.compression_ratio.render()[2:])
+
+        body = b"".join(res.streaming_content)  # type: ignore
+
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertIn(
+            'http_response_compression_ratio_count{view="recipe:recipe-export",encoding="gzip"} 1',
+            metrics.compression_ratio.render(),
+        )
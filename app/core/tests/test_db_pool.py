@@ -0,0 +1,188 @@
+"""
+Tests for the pooled postgresql backend
+"""
+from unittest.mock import patch
+
+from core.backends.postgresql_pool.base import DatabaseWrapper
+from core.backends.postgresql_pool.pool import ConnectionPool, clear_pools, is_healthy
+from django.db import connection
+from django.test import SimpleTestCase
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
+
+
+class FakeCursor:
+    def __init__(self, connection) -> None:
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def execute(self, sql: str) -> None:
+        self.connection.executed.append((sql, self.connection.autocommit))
+
+
+class FakeConnection:
+    def __init__(self, status=TRANSACTION_STATUS_IDLE) -> None:
+        self.closed = 0
+        self.status = status
+        self.autocommit = False
+        self.executed = []
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def get_transaction_status(self) -> int:
+        return self.status
+
+    def rollback(self) -> None:
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+def healthy(connection) -> bool:
+    return True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuse_connection(self) -> None:
+        """Test checked in connections are handed out again"""
+
+        pool = ConnectionPool(max_idle=2, max_lifetime=60, probe=healthy)
+        conn = FakeConnection()
+
+        self.assertIsNone(pool.checkout())
+        pool.track(conn)
+        pool.checkin(conn)
+
+        self.assertIs(pool.checkout(), conn)
+        self.assertEqual(pool.stats()["reuse_rate"], 0.5)
+
+    def test_max_idle(self) -> None:
+        """Test idle connections over the limit are closed"""
+
+        pool = ConnectionPool(max_idle=1, max_lifetime=60, probe=healthy)
+        kept, extra = FakeConnection(), FakeConnection()
+
+        pool.checkin(kept)
+        pool.checkin(extra)
+
+        self.assertEqual(len(pool), 1)
+        self.assertFalse(kept.closed)
+        self.assertTrue(extra.closed)
+
+    def test_unhealthy_connection_discarded(self) -> None:
+        """Test connections failing the probe are replaced"""
+
+        pool = ConnectionPool(max_idle=2, max_lifetime=60, probe=lambda conn: False)
+        conn = FakeConnection()
+        pool.checkin(conn)
+
+        self.assertIsNone(pool.checkout())
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    @patch("core.backends.postgresql_pool.pool.time.monotonic")
+    def test_max_lifetime(self, patched_monotonic) -> None:
+        """Test connections older than max lifetime are closed"""
+
+        pool = ConnectionPool(max_idle=2, max_lifetime=60, probe=healthy)
+        conn = FakeConnection()
+        patched_monotonic.return_value = 100
+        pool.track(conn)
+        pool.checkin(conn)
+
+        patched_monotonic.return_value = 161
+
+        self.assertIsNone(pool.checkout())
+        self.assertTrue(conn.closed)
+
+    def test_checkin_rolls_back(self) -> None:
+        """Test connections left in a failed transaction are reset"""
+
+        pool = ConnectionPool(max_idle=2, max_lifetime=60, probe=healthy)
+        conn = FakeConnection(status=TRANSACTION_STATUS_INERROR)
+
+        pool.checkin(conn)
+
+        self.assertIs(pool.checkout(), conn)
+        self.assertEqual(conn.status, TRANSACTION_STATUS_IDLE)
+
+    def test_checkin_discards_session_state(self) -> None:
+        """Test session state is discarded outside of a transaction"""
+
+        pool = ConnectionPool(max_idle=2, max_lifetime=60, probe=healthy)
+        conn = FakeConnection()
+
+        pool.checkin(conn)
+
+        self.assertEqual(conn.executed, [("DISCARD ALL", True)])
+        self.assertFalse(conn.autocommit)
+
+    def test_is_healthy(self) -> None:
+        """Test probe treats connection errors as unhealthy"""
+
+        for error in [OperationalError, InterfaceError]:
+            conn = FakeConnection()
+            with patch.object(conn, "cursor", side_effect=error):
+                self.assertFalse(is_healthy(conn))
+
+        closed = FakeConnection()
+        closed.closed = 1
+        self.assertFalse(is_healthy(closed))
+
+
+class PooledBackendTests(SimpleTestCase):
+    databases = {"default"}
+
+    def test_connection_reused(self) -> None:
+        """Test closing a pooled backend connection keeps it open for reuse"""
+
+        # own connection params so the test gets a pool of its own
+        options = {**connection.settings_dict["OPTIONS"], "application_name": "pool_test"}
+        settings_dict = {**connection.settings_dict, "OPTIONS": options, "POOL": {"MAX_IDLE": 1}}
+        db = DatabaseWrapper(settings_dict, alias=connection.alias)
+        self.addCleanup(clear_pools)
+        self.addCleanup(db.close)
+        pool = db.get_pool(db.get_connection_params())
+
+        with db.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            pid = cursor.fetchone()[0]
+        raw = db.connection
+        db.close()
+
+        self.assertFalse(raw.closed)
+        with db.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            self.assertEqual(cursor.fetchone()[0], pid)
+        db.close()
+
+        self.assertEqual(pool.stats()["reuse_rate"], 0.5)
+
+    def test_session_reset(self) -> None:
+        """Test settings made by one user of a pooled connection don't reach the next"""
+
+        options = {**connection.settings_dict["OPTIONS"], "application_name": "pool_reset_test"}
+        settings_dict = {**connection.settings_dict, "OPTIONS": options, "POOL": {"MAX_IDLE": 1}}
+        db = DatabaseWrapper(settings_dict, alias=connection.alias)
+        self.addCleanup(clear_pools)
+        self.addCleanup(db.close)
+
+        with db.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            default = cursor.fetchone()[0]
+            cursor.execute("SET statement_timeout = 1234")
+            cursor.execute("SELECT pg_backend_pid()")
+            pid = cursor.fetchone()[0]
+        db.close()
+
+        with db.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid(), current_setting('statement_timeout')")
+            self.assertEqual(cursor.fetchone(), (pid, default))
+        db.close()
@@ -0,0 +1,134 @@
+"""
+Tests for read replica routing
+"""
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from core.db_router import is_pinned, routing_scope
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+ME_URL = reverse("user:me")
+
+
+def create_recipe(user) -> Recipe:
+    return Recipe.objects.create(user=user, title="Sample recipe", time_minutes=5, price=Decimal("5.50"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0", "replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_reads_outside_scope_use_primary(self) -> None:
+        """Test reads only move to a replica when the scope opts in"""
+
+        self.assertEqual(Recipe.objects.all().db, "default")
+        with routing_scope():
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    def test_reads_in_replica_scope(self) -> None:
+        """Test opted in reads go to one of the replicas, writes to the primary"""
+
+        with routing_scope(use_replica=True):
+            self.assertIn(Recipe.objects.all().db, ["replica_0", "replica_1"])
+            self.assertEqual(Recipe.objects.select_for_update().db, "default")
+
+    def test_read_after_write_uses_primary(self) -> None:
+        """Test a write pins the rest of the scope and the user to the primary"""
+
+        with routing_scope(1, use_replica=True):
+            router.db_for_write(Recipe)
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+        self.assertTrue(is_pinned(1))
+        with routing_scope(1, use_replica=True):
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self) -> None:
+        """Test everything uses the primary without replicas"""
+
+        with routing_scope(use_replica=True):
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    def test_replicas_not_migrated(self) -> None:
+        """Test migrations only run on the primary"""
+
+        self.assertFalse(router.allow_migrate("replica_0", "core"))
+        self.assertTrue(router.allow_migrate("default", "core"))
+
+
+# the primary stands in for the replica, the routing decisions are recorded
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+@patch("core.db_router.random.choice", return_value="default")
+class ReplicaReadViewTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_get_reads_from_replica(self, patched_choice) -> None:
+        """Test recipe list GETs read from a replica"""
+
+        create_recipe(self.user)
+
+        self.client.get(RECIPES_URL)
+
+        patched_choice.assert_called_with(["replica_0"])
+
+    def test_write_pins_user_to_primary(self, patched_choice) -> None:
+        """Test reads after a write go to the primary"""
+
+        res = self.client.post(RECIPES_URL, {"title": "Recipe", "time_minutes": 5, "price": "5.00"})
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(is_pinned(self.user.pk))
+
+        self.client.get(RECIPES_URL)
+        self.client.patch(ME_URL, {"name": "Updated"})
+        self.client.get(ME_URL)
+
+        patched_choice.assert_not_called()
+
+
+@skipUnless("replica_0" in settings.DATABASES, "needs DB_REPLICA_HOSTS")
+class ReplicaIntegrationTests(TransactionTestCase):
+    """Test routing against a real replica alias mirroring the test database"""
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_reads_on_replica_writes_on_primary(self) -> None:
+        """Test list queries run on the replica until the user writes"""
+
+        create_recipe(self.user)
+
+        with CaptureQueriesContext(connections["replica_0"]) as replica:
+            with override_settings(DATABASE_REPLICAS=["replica_0"]):
+                res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.json()), 1)
+        self.assertTrue(any("core_recipe" in query["sql"] for query in replica.captured_queries))
+
+        with CaptureQueriesContext(connections["replica_0"]) as replica:
+            with override_settings(DATABASE_REPLICAS=["replica_0"]):
+                self.client.post(RECIPES_URL, {"title": "Recipe", "time_minutes": 5, "price": "5.00"})
+                res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.json()), 2)
+        self.assertEqual(replica.captured_queries, [])
@@ -0,0 +1,104 @@
+"""
+Tests for the password hashers and the hashing pool
+"""
+import threading
+from unittest.mock import patch
+
+from core.hashers import HashingBusy, HashingPool
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TOKEN_URL = reverse("user:token")
+
+
+class HashingPoolTests(SimpleTestCase):
+    def test_runs_in_worker(self) -> None:
+        """Test work runs in a pool thread and returns its result"""
+
+        pool = HashingPool(workers=1, queue_size=0, timeout=1)
+
+        self.assertTrue(pool.run(lambda: threading.current_thread().name).startswith("hashing"))
+
+    def test_nested_run_stays_in_worker(self) -> None:
+        """Test hashing inside a hash doesn't wait for a second slot"""
+
+        pool = HashingPool(workers=1, queue_size=0, timeout=0.1)
+
+        self.assertEqual(pool.run(lambda: pool.run(lambda: 42)), 42)
+
+    def test_busy(self) -> None:
+        """Test callers over the pool capacity are turned away"""
+
+        pool = HashingPool(workers=1, queue_size=0, timeout=0.01)
+        started, release = threading.Event(), threading.Event()
+
+        def block() -> None:
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=pool.run, args=(block,))
+        thread.start()
+        started.wait(5)
+
+        try:
+            with self.assertRaises(HashingBusy):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            thread.join()
+
+    def test_inline_without_workers(self) -> None:
+        """Test hashes run in the calling thread when the pool is off"""
+
+        pool = HashingPool(workers=0, queue_size=0, timeout=0)
+
+        self.assertEqual(pool.run(threading.current_thread), threading.current_thread())
+
+
+class PasswordHasherTests(TestCase):
+    def test_new_passwords_use_argon2(self) -> None:
+        """Test argon2 with the configured costs hashes new passwords"""
+
+        user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+
+        self.assertEqual(identify_hasher(user.password).algorithm, "argon2")
+        self.assertIn("m=19456,t=2,p=1", user.password)
+
+    def test_rehash_on_login(self) -> None:
+        """Test PBKDF2 hashes are upgraded when the user gets a token"""
+
+        user = get_user_model().objects.create_user("user@example.com", None)  # type: ignore
+        user.password = make_password("testpass123", hasher="pbkdf2_sha256")
+        user.save()
+
+        res = APIClient().post(TOKEN_URL, {"email": "user@example.com", "password": "testpass123"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, "argon2")
+
+    @patch("core.hashers.hashing_pool")
+    def test_token_busy(self, patched_pool) -> None:
+        """Test token endpoint answers 503 when no hashing slot is free"""
+
+        patched_pool.run.side_effect = HashingBusy
+
+        res = APIClient().post(TOKEN_URL, {"email": "user@example.com", "password": "testpass123"})
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+    def test_admin_login_busy(self) -> None:
+        """Test the admin login answers 503 as well"""
+
+        get_user_model().objects.create_superuser("admin@example.com", "testpass123")  # type: ignore
+
+        with patch("core.hashers.hashing_pool.run", side_effect=HashingBusy):
+            res = self.client.post(reverse("admin:login"), {"username": "admin@example.com", "password": "testpass123"})
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
@@ -0,0 +1,62 @@
+"""
+Tests for the URL patterns importing their views lazily
+"""
+from unittest.mock import patch
+
+from core.lazy import lazy_include, lazy_view
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import URLResolver, path, reverse
+from django.urls.resolvers import RegexPattern
+from django.utils.module_loading import import_string
+
+urlpatterns = [
+    lazy_include("lazy-admin/", "app.admin_urls", namespace="admin"),
+    path("lazy-schema/", lazy_view("core.schema.CachedSpectacularAPIView"), name="lazy-schema"),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class LazyURLTests(TestCase):
+    def test_lazy_view(self) -> None:
+        """Test the view is imported by the first request only"""
+
+        with patch("core.lazy.import_string", wraps=import_string) as imported:
+            view = lazy_view("django.views.generic.RedirectView", url="/target/")
+            imported.assert_not_called()
+
+            responses = [view(RequestFactory().get("/")) for _ in range(2)]
+
+        imported.assert_called_once_with("django.views.generic.RedirectView")
+        self.assertEqual([res.url for res in responses], ["/target/", "/target/"])
+
+    def test_lazy_class_view_served(self) -> None:
+        """Test class based views are served with their initkwargs"""
+
+        res = self.client.get(reverse("lazy-schema"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b"openapi", res.content)
+
+    def test_lazy_include_unloaded(self) -> None:
+        """Test reversing other names leaves the urlconf unimported"""
+
+        lazy = lazy_include("lazy-admin/", "app.admin_urls", namespace="admin")
+        root = URLResolver(RegexPattern(r"^/"), [lazy, *urlpatterns[1:]])
+
+        self.assertTrue(root.reverse_dict.getlist("lazy-schema"))
+        self.assertNotIn("urlconf_module", lazy.__dict__)
+
+        self.assertTrue(root.namespace_dict["admin"][1].reverse_dict.getlist("index"))
+        self.assertIn("urlconf_module", lazy.__dict__)
+
+    def test_lazy_include_served(self) -> None:
+        """Test the admin works when included lazily"""
+
+        user = get_user_model().objects.create_superuser("admin@example.com", "testpass123")  # type: ignore
+        self.client.force_login(user)
+
+        res = self.client.get(reverse("admin:core_recipe_changelist"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.request["PATH_INFO"].startswith("/lazy-admin/"))
@@ -0,0 +1,138 @@
+"""
+Tests for the instrumentation middleware and metrics endpoint
+"""
+import re
+import time
+from unittest.mock import patch
+
+from core import metrics
+from core.middleware import InstrumentationMiddleware, install_query_recorder
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import RecipeRowEncoder
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+METRICS_URL = reverse("metrics")
+
+
+class InstrumentationDisabledTests(SimpleTestCase):
+    def test_not_used_when_disabled(self) -> None:
+        """Test middleware takes itself out of the chain by default"""
+
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentationMiddleware(lambda request: HttpResponse())
+
+    def test_metrics_not_found_when_disabled(self) -> None:
+        """Test metrics endpoint is hidden while disabled"""
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 404)
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        Recipe.objects.create(user=self.user, title="Recipe", time_minutes=5, price="5.00")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # the async test client sends request_started from another thread
+        # than the one running the queries, servers send it from that one
+        install_query_recorder(connection)
+
+    def test_server_timing(self) -> None:
+        """Test responses report DB, serialization and total time"""
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL)
+
+        timing = res["Server-Timing"]
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    def serialize_ms(self, res) -> float:
+        return float(re.search(r"serialize;dur=([0-9.]+)", res["Server-Timing"]).group(1))
+
+    def test_serialization_in_view_measured(self) -> None:
+        """Test field conversion inside the view counts as serialization time"""
+
+        recipe = Recipe.objects.get()
+        to_representation = serializers.DecimalField.to_representation
+
+        def slow(field, value):
+            time.sleep(0.05)
+            return to_representation(field, value)
+
+        with patch.object(serializers.DecimalField, "to_representation", slow):
+            res = self.client.get(reverse("recipe:recipe-detail", args=[recipe.id]))
+        self.assertGreaterEqual(self.serialize_ms(res), 50)
+
+        encode = RecipeRowEncoder.encode
+
+        def slow_encode(encoder, row):
+            time.sleep(0.05)
+            return encode(encoder, row)
+
+        with patch.object(RecipeRowEncoder, "encode", slow_encode):
+            res = self.client.get(RECIPES_URL)
+        self.assertGreaterEqual(self.serialize_ms(res), 50)
+
+    def test_queries_not_serialization(self) -> None:
+        """Test queries run while serializing count as DB time only"""
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        try:
+            with metrics.measure_serialization(), metrics.measure_serialization():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_sleep(0.05)")
+        finally:
+            metrics.current_request.reset(token)
+
+        self.assertGreaterEqual(request_metrics.db_time, 0.05)
+        self.assertLess(request_metrics.serialize_time, 0.025)
+
+    def test_metrics_histograms(self) -> None:
+        """Test requests are recorded per view in the metrics output"""
+
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = res.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="recipe:recipe-list",method="GET"} 2', body)
+        self.assertIn('http_request_queries_bucket{view="recipe:recipe-list",method="GET",le="1"} 2', body)
+        self.assertIn("# TYPE http_request_db_seconds histogram", body)
+
+    @override_settings(INSTRUMENTATION_METRICS_TOKEN="secret")
+    def test_metrics_token(self) -> None:
+        """Test metrics require the bearer token when one is configured"""
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 401)
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, 200)
+
+    async def test_async_view(self) -> None:
+        """Test queries run in worker threads of async views are counted"""
+
+        # token lookup and recipe list, extra kwargs are ASGI header names
+        res = await AsyncClient().get(reverse("recipe:recipe-list-async"), authorization=f"Token {self.token.key}")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('desc="2 queries"', res["Server-Timing"])
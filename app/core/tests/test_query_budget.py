@@ -0,0 +1,60 @@
+"""
+Tests for the query budget test mixin
+"""
+from core.models import Recipe
+from core.tests.utils import QueryBudgetMixin, normalize_sql, repeated_queries
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class RepeatedQueriesTests(SimpleTestCase):
+    def test_normalize_sql(self) -> None:
+        """Test literal values are replaced"""
+
+        sql = "SELECT * FROM \"core_recipe\" WHERE id = 12 AND title = 'it''s' AND price > 5.25"
+
+        self.assertEqual(normalize_sql(sql), 'SELECT * FROM "core_recipe" WHERE id = ? AND title = ? AND price > ?')
+
+    def test_repeated_queries(self) -> None:
+        """Test queries differing only in values are grouped"""
+
+        queries = [{"sql": f"SELECT * FROM core_user WHERE id = {pk}"} for pk in (1, 2, 3)]
+        queries.append({"sql": "SELECT * FROM core_recipe"})
+
+        self.assertEqual(repeated_queries(queries), ["3x SELECT * FROM core_user WHERE id = ?"])
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = {"GET recipe:recipe-list": 2}
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        Recipe.objects.create(user=self.user, title="Recipe", time_minutes=5, price="5.00")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_within_budget(self) -> None:
+        """Test requests within their budget pass"""
+
+        self.assertEqual(self.client.get(RECIPES_URL).status_code, 200)
+
+    def test_over_budget(self) -> None:
+        """Test requests over their budget fail listing the queries"""
+
+        self.query_budgets = {"GET recipe:recipe-list": 0}
+
+        with self.assertRaisesRegex(AssertionError, r"GET recipe:recipe-list ran 1 queries, budget is 0"):
+            self.client.get(RECIPES_URL)
+
+    def test_strict_requires_budget(self) -> None:
+        """Test strict mode fails requests to endpoints without a budget"""
+
+        self.client.get(reverse("user:me"))
+        self.strict_query_budgets = True
+
+        with self.assertRaisesRegex(AssertionError, "GET user:me has no query budget"):
+            self.client.get(reverse("user:me"))
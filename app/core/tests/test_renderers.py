@@ -0,0 +1,70 @@
+"""Tests for the fast JSON renderer and parser"""
+
+import datetime
+import io
+from collections import OrderedDict
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+
+sample_data = OrderedDict(
+    [
+        ("id", 1),
+        ("price", Decimal("5.25")),
+        ("created", datetime.datetime(2023, 1, 9, 11, 26, 1, 123456, tzinfo=timezone.utc)),
+        ("day", datetime.date(2023, 1, 9)),
+        ("label", gettext_lazy("Ordering")),
+        ("errors", [ErrorDetail("This field is required.", code="required")]),
+        ("nested", {1: "int key", "text": "Śniadanie\u2028\u2029"}),
+    ]
+)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_json_renderer(self) -> None:
+        """Test rendering is byte for byte the same as DRF's renderer"""
+
+        self.assertEqual(FastJSONRenderer().render(sample_data), JSONRenderer().render(sample_data))
+
+    def test_indent_falls_back_to_json_renderer(self) -> None:
+        """Test pretty printing requests are served by the stdlib renderer"""
+
+        rendered = FastJSONRenderer().render(sample_data, "application/json; indent=4")
+
+        self.assertEqual(rendered, JSONRenderer().render(sample_data, "application/json; indent=4"))
+
+    @patch("core.renderers.orjson", None)
+    def test_without_orjson(self) -> None:
+        """Test renderer still works when orjson isn't installed"""
+
+        self.assertEqual(FastJSONRenderer().render(sample_data), JSONRenderer().render(sample_data))
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse(self) -> None:
+        """Test parsing a JSON body"""
+
+        data = FastJSONParser().parse(io.BytesIO('{"title": "Śniadanie", "items": [1, 2]}'.encode()))
+
+        self.assertEqual(data, {"title": "Śniadanie", "items": [1, 2]})
+
+    def test_parse_error(self) -> None:
+        """Test malformed JSON raises a parse error"""
+
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
+
+    @patch("core.parsers.orjson", None)
+    def test_parse_without_orjson(self) -> None:
+        """Test parser falls back to DRF's JSONParser"""
+
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"id": 1}')), {"id": 1})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
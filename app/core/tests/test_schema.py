@@ -0,0 +1,97 @@
+"""
+Tests for the cached OpenAPI schema endpoint
+"""
+import gzip
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from core import schema
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+
+SCHEMA_URL = reverse("api-schema")
+
+
+class CachedSchemaTests(SimpleTestCase):
+    def setUp(self) -> None:
+        schema.clear()
+        self.addCleanup(schema.clear)
+
+    def test_schema_matches_uncached(self) -> None:
+        """Test the cached schema is the one the view renders itself"""
+
+        for params in [{}, {"format": "json"}]:
+            res = self.client.get(SCHEMA_URL, params)
+            with override_settings(SCHEMA_CACHE=False):
+                expected = self.client.get(SCHEMA_URL, params)
+
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.content, expected.content)
+            self.assertEqual(res["Content-Type"], expected["Content-Type"])
+
+    def test_schema_generated_once(self) -> None:
+        """Test repeated requests don't introspect the views again"""
+
+        with patch.object(SchemaGenerator, "get_schema", wraps=SchemaGenerator().get_schema) as patched:
+            self.client.get(SCHEMA_URL)
+            self.client.get(SCHEMA_URL)
+
+        self.assertEqual(patched.call_count, 1)
+
+    @override_settings(LANGUAGES=[("en", "English"), ("de", "German")])
+    def test_schema_languages(self) -> None:
+        """Test only the configured languages are rendered and kept"""
+
+        for lang in ["de", "fr", "x" * 100, "en-us", ""]:
+            self.client.get(SCHEMA_URL, {"lang": lang})
+
+        self.assertEqual(sorted(schema._artifacts), [("yaml", ""), ("yaml", "de")])
+
+    def test_schema_not_modified(self) -> None:
+        """Test a strong ETag revalidates to a 304"""
+
+        res = self.client.get(SCHEMA_URL)
+        etag = res["ETag"]
+
+        self.assertFalse(etag.startswith("W/"))
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_schema_gzipped(self) -> None:
+        """Test the precompressed body is sent to clients accepting gzip, under its own ETag"""
+
+        plain = self.client.get(SCHEMA_URL)
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", res["Vary"])
+        # each representation only revalidates its own tag
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_schema_served_from_artifact(self) -> None:
+        """Test files written by build_schema are served as they are"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command("build_schema", "--output-dir", directory, stdout=out)
+            self.assertEqual(sorted(os.listdir(directory)), ["schema.json", "schema.yaml"])
+
+            path = schema.artifact_path(directory, "yaml")
+            with open(path, "ab") as f:
+                f.write(b"# built\n")
+
+            with override_settings(SCHEMA_ARTIFACT_DIR=directory):
+                res = self.client.get(SCHEMA_URL)
+
+        self.assertTrue(res.content.endswith(b"# built\n"))
+        self.assertIn("version", out.getvalue())
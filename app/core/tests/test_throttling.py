@@ -0,0 +1,121 @@
+"""
+Tests for the sliding window throttles
+"""
+import threading
+from unittest.mock import patch
+
+from core.cache import TTLCache
+from core.throttling import SlidingWindowRateThrottle, TokenRateThrottle
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+
+class ClockThrottle(SlidingWindowRateThrottle):
+    scope = "test"
+    now = 0.0
+
+    def timer(self) -> float:
+        return ClockThrottle.now
+
+    def get_cache_key(self, request, view):
+        return "throttle:test:client"
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"test": "4/min"}})
+class SlidingWindowRateThrottleTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.request = APIRequestFactory().get("/")
+
+    def allow(self, at: float) -> bool:
+        ClockThrottle.now = at
+        throttle = ClockThrottle()
+        allowed = throttle.allow_request(self.request, None)
+        self.wait = None if allowed else throttle.wait()
+        return allowed
+
+    def test_limit_within_window(self) -> None:
+        """Test requests over the rate are rejected until the window moves on"""
+
+        self.assertEqual([self.allow(60 + i) for i in range(5)], [True] * 4 + [False])
+        self.assertAlmostEqual(self.wait, 56)
+
+        self.assertFalse(self.allow(120))
+        self.assertTrue(self.allow(121))
+
+    def test_previous_window_slides_out(self) -> None:
+        """Test the previous window counts in proportion to its overlap"""
+
+        for _ in range(4):
+            self.allow(119)
+
+        # 5/6 of the previous window still overlaps, 4 * 5/6 + 1 > 4 after this one
+        self.assertTrue(self.allow(130))
+        self.assertFalse(self.allow(130))
+        self.assertAlmostEqual(self.wait, 5)
+        self.assertTrue(self.allow(135.5))
+
+    @patch("core.throttling.local_counters", TTLCache(maxsize=10, ttl=60))
+    @patch.object(ClockThrottle, "cache")
+    def test_local_fallback(self, patched_cache) -> None:
+        """Test counting in process when the shared cache fails"""
+
+        patched_cache.get.side_effect = ConnectionError
+        patched_cache.add.side_effect = ConnectionError
+        patched_cache.decr.side_effect = ConnectionError
+
+        self.assertEqual([self.allow(60) for _ in range(5)], [True] * 4 + [False])
+
+    def test_concurrent_burst(self) -> None:
+        """Test a burst arriving at once is limited to the rate"""
+
+        ClockThrottle.now = 60
+        throttles = [ClockThrottle() for _ in range(10)]
+        barrier = threading.Barrier(len(throttles))
+        results = []
+
+        def request(throttle):
+            barrier.wait()
+            results.append(throttle.allow_request(self.request, None))
+
+        threads = [threading.Thread(target=request, args=[throttle]) for throttle in throttles]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 4)
+        # rejected requests were taken back out of the count
+        self.assertEqual(cache.get("throttle:test:client:1"), 4)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"test": None}})
+    def test_disabled_scope(self) -> None:
+        """Test a scope without rate is not limited"""
+
+        self.assertTrue(all(self.allow(60) for _ in range(10)))
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}})
+    def test_missing_scope(self) -> None:
+        """Test a scope missing from the settings is a configuration error"""
+
+        with self.assertRaises(ImproperlyConfigured):
+            ClockThrottle()
+
+
+class ClientAddressTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4, 10.0.0.9")
+
+    def test_forwarded_for_ignored(self) -> None:
+        """Test clients can't pick their address with X-Forwarded-For"""
+
+        self.assertEqual(TokenRateThrottle().get_cache_key(self.request, None), "throttle:token:10.0.0.1")
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_behind_proxy(self) -> None:
+        """Test the address added by the proxy is used behind one"""
+
+        self.assertEqual(TokenRateThrottle().get_cache_key(self.request, None), "throttle:token:10.0.0.9")
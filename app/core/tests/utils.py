@@ -0,0 +1,92 @@
+"""Helpers shared by the test suites"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# literals differ between the repeated queries of an N+1
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with literal values replaced by ?"""
+    return _LITERALS.sub("?", sql)
+
+
+def repeated_queries(queries: List[Dict]) -> List[str]:
+    """Queries run more than once with different values, most frequent first"""
+
+    counts = Counter(normalize_sql(query["sql"]) for query in queries)
+    return [f"{count}x {sql}" for sql, count in counts.most_common() if count > 1]
+
+
+class QueryBudgetMixin:
+    """Fail API requests of a test running more queries than their endpoint allows
+
+    query_budgets maps "<METHOD> <url name>" or "<url name>" to the maximum
+    number of queries a single request may run, whatever the amount of data.
+    Every request made through the test client is checked. With
+    strict_query_budgets (QUERY_BUDGET_STRICT by default) requests to
+    endpoints missing from query_budgets fail as well.
+    """
+
+    query_budgets: Dict[str, int] = {}
+    strict_query_budgets: Optional[bool] = None
+
+    def _pre_setup(self) -> None:
+        super()._pre_setup()  # type: ignore
+        request = Client.request
+        mixin = self
+
+        def budgeted_request(client, **kwargs):
+            with CaptureQueriesContext(connection) as context:
+                response = request(client, **kwargs)
+                if response.streaming:
+                    # streamed bodies query while being read
+                    response.streaming_content = [b"".join(response.streaming_content)]
+            mixin.check_query_budget(response, context.captured_queries)
+            return response
+
+        self._query_budget_patch = patch.object(Client, "request", budgeted_request)
+        self._query_budget_patch.start()
+
+    def _post_teardown(self) -> None:
+        self._query_budget_patch.stop()
+        super()._post_teardown()  # type: ignore
+
+    def get_query_budget(self, method: str, view_name: str) -> Optional[int]:
+        budget = self.query_budgets.get(f"{method} {view_name}")
+        return self.query_budgets.get(view_name) if budget is None else budget
+
+    def check_query_budget(self, response, queries: List[Dict]) -> None:
+        match = response.resolver_match
+        if match is None:
+            return
+
+        method = response.request["REQUEST_METHOD"]
+        budget = self.get_query_budget(method, match.view_name)
+        endpoint = f"{method} {match.view_name}"
+
+        if budget is None:
+            strict = self.strict_query_budgets
+            if strict is None:
+                strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+            if strict:
+                self.fail(f"{endpoint} has no query budget, add it to query_budgets")  # type: ignore
+            return
+
+        if len(queries) > budget:
+            lines = [f"{endpoint} ran {len(queries)} queries, budget is {budget}"]
+            repeated = repeated_queries(queries)
+            if repeated:
+                lines.append("Repeated queries:")
+                lines.extend(f"  {query}" for query in repeated)
+            lines.append("Queries:")
+            lines.extend(f"  {query['sql']}" for query in queries)
+            self.fail("\n".join(lines))  # type: ignore
@@ -0,0 +1,147 @@
+"""Sliding window rate limits for the APIs
+
+Each scope keeps one counter per fixed window in the cache. A request's
+count is the current window's counter plus the previous one's, weighted
+by how much of the previous window still overlaps the sliding window.
+That costs one get and one incr per request, unlike DRF's timestamp
+list throttles which rewrite the whole history every time. The counter
+is incremented before deciding, so concurrent requests each see their
+own count and a burst can't slip through between a read and a write.
+
+Throttles run before the view, so rejected requests never reach
+password hashing or the database. If the shared cache is down the
+counters are kept in process, which is per worker but still bounded.
+"""
+
+import hashlib
+
+from core.cache import TTLCache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# windows are identified by their index, stale ones are never read and
+# only linger until pushed out by the size bound or two days pass
+local_counters = TTLCache(maxsize=getattr(settings, "THROTTLE_LOCAL_CACHE_SIZE", 10000), ttl=2 * 86400)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """Base class for rates set per scope in DEFAULT_THROTTLE_RATES"""
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def get_rate(self):
+        # read on every request so changed settings apply, DRF reads them once
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key, previous_key = f"{key}:{window}", f"{key}:{window - 1}"
+        self.previous = self.get_count(previous_key)
+        # counts this request, whatever else arrives at the same time
+        count = self.increment(current_key)
+        self.elapsed = self.now - window * self.duration
+
+        # earlier requests only, as wait() expects
+        self.current = count - 1
+        if self.previous * (1 - self.elapsed / self.duration) + self.current >= self.num_requests:
+            # rejected requests don't use up the rate
+            self.decrement(current_key)
+            return False
+
+        return True
+
+    def wait(self):
+        if self.current >= self.num_requests:
+            # the current window becomes the previous one, then has to slide out far enough
+            return self.duration - self.elapsed + self.duration * (1 - self.num_requests / self.current)
+
+        return self.duration * (1 - (self.num_requests - self.current) / self.previous) - self.elapsed
+
+    def get_count(self, key: str) -> int:
+        try:
+            return self.cache.get(key, 0)
+        except Exception:
+            # shared cache unavailable, count in process instead
+            return local_counters.get(key) or 0
+
+    def increment(self, key: str) -> int:
+        """Add this request to the counter, returns the new count"""
+
+        try:
+            # both windows are read, keep the counter for two of them
+            self.cache.add(key, 0, 2 * self.duration)
+            return self.cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            self.cache.set(key, 1, 2 * self.duration)
+            return 1
+        except Exception:
+            return local_counters.incr(key)
+
+    def decrement(self, key: str) -> None:
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            # expired meanwhile, nothing left to undo
+            pass
+        except Exception:
+            local_counters.incr(key, -1)
+
+
+class TokenRateThrottle(SlidingWindowRateThrottle):
+    """Token requests per client address"""
+
+    scope = "token"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class TokenEmailRateThrottle(SlidingWindowRateThrottle):
+    """Token requests per account, however many addresses they come from"""
+
+    scope = "token_email"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email or not isinstance(email, str):
+            return None
+
+        ident = hashlib.md5(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class SignupRateThrottle(SlidingWindowRateThrottle):
+    """Account creations per client address"""
+
+    scope = "signup"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class RecipeWriteRateThrottle(SlidingWindowRateThrottle):
+    """Recipe writes per user, reads are not limited"""
+
+    scope = "recipe_write"
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -0,0 +1,89 @@
+"""Views and view mixins served by the core app"""
+
+from typing import List, Optional
+
+from core import metrics
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class SparseFieldsMixin:
+    """Let clients pick the fields of read responses with ?fields= or ?omit=
+
+    e.g. ?fields=id,title or ?omit=link, both take comma separated names of
+    readable serializer fields. The serializer must use DynamicFieldsMixin,
+    views trim their queries with get_sparse_fields() as well.
+    """
+
+    fields_param = "fields"
+    omit_param = "omit"
+    # viewset actions taking the parameters, None for every read
+    sparse_fields_actions: Optional[List[str]] = None
+
+    def get_sparse_fields(self) -> Optional[List[str]]:
+        """Fields requested for the response in serializer order, None for all"""
+
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+
+        request = self.request  # type: ignore
+        params = request.query_params
+        requested = self.fields_param in params or self.omit_param in params
+        actions = self.sparse_fields_actions
+        in_action = actions is None or getattr(self, "action", None) in actions
+        # writes validate and return every field
+        if not requested or not in_action or request.method not in SAFE_METHODS:
+            self._sparse_fields = None
+            return None
+
+        serializer_fields = self.get_serializer_class()().fields  # type: ignore
+        available = [name for name, field in serializer_fields.items() if not field.write_only]
+        fields = available
+        errors = {}
+
+        for param in (self.fields_param, self.omit_param):
+            if param not in params:
+                continue
+            names = {name.strip() for name in params[param].split(",") if name.strip()}
+            unknown = names - set(available)
+            if unknown:
+                errors[param] = [f"Unknown fields: {', '.join(sorted(unknown))}. Choose from: {', '.join(available)}."]
+            elif param == self.fields_param:
+                fields = [name for name in fields if name in names]
+            else:
+                fields = [name for name in fields if name not in names]
+
+        if errors:
+            raise ValidationError(errors)
+        if not fields:
+            raise ValidationError({self.fields_param: ["At least one field must be selected."]})
+
+        self._sparse_fields = fields
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+
+        return super().get_serializer(*args, **kwargs)  # type: ignore
+
+
+@require_safe
+def metrics_view(request):
+    """Request histograms and pool stats in the Prometheus text format"""
+
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise Http404()
+
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    if token and not constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+
+    return HttpResponse(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,73 @@
+"""Async read views for recipe APIs
+
+Django's ORM is synchronous, so queries run in a worker thread through
+sync_to_async while the event loop keeps serving other requests, one
+thread per request when served by app.asgi (see core.asgi). Query
+parameters, filters, pagination and output match the RecipeViewSet views.
+"""
+
+from asgiref.sync import sync_to_async
+from core.authentication import aauthenticate_token
+from core.db_router import routing_scope
+from core.http import SAFE_METHODS, json_response, unauthorized_response
+from django.http import HttpResponse, HttpResponseNotAllowed
+from recipe.views import RecipeViewSet
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+
+# set by CachedResponseMixin, passed on to the plain Django response
+CACHE_HEADERS = ["ETag", "Last-Modified", "Vary"]
+
+
+def _read(request, user, action: str, **kwargs):
+    """Run a read action of RecipeViewSet for user through its response cache"""
+
+    drf_request = Request(request)
+    drf_request.user = user
+    view = RecipeViewSet(request=drf_request, action=action, args=(), kwargs=kwargs, format_kwarg=None)
+
+    try:
+        with routing_scope(user.pk, use_replica=True):
+            if action == "list":
+                response = view.list(drf_request)
+            else:
+                response = view.retrieve(drf_request, **kwargs)
+    except Exception as exc:
+        # 400/404 etc. the same way DRF views report them
+        response = exception_handler(exc, {"view": view, "request": drf_request})
+        if response is None:
+            raise
+
+    return response
+
+
+async def _respond(request, action: str, **kwargs) -> HttpResponse:
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+
+    user = await aauthenticate_token(request)
+    if user is None:
+        return unauthorized_response()
+
+    response = await sync_to_async(_read)(request, user, action, **kwargs)
+    if not isinstance(response, Response):
+        # 304 for a matching If-None-Match or If-Modified-Since
+        return response
+
+    result = json_response(response.data, response.status_code)
+    for header in CACHE_HEADERS:
+        if response.has_header(header):
+            result[header] = response[header]
+    return result
+
+
+async def recipe_list(request):
+    """List recipes of the authenticated user"""
+    return await _respond(request, "list")
+
+
+async def recipe_detail(request, pk: int):
+    """Retrieve a recipe of the authenticated user"""
+    return await _respond(request, "retrieve", pk=pk)
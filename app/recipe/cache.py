@@ -0,0 +1,122 @@
+"""Response caching for recipe APIs
+
+Responses are cached per user under a version counter. Any write bumps
+the user's version, which makes every cached response of that user stale
+at once without having to find and delete the individual keys.
+"""
+
+import hashlib
+import time
+from typing import Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+# how long a cached response lives, versions themselves never expire
+RESPONSE_TIMEOUT = getattr(settings, "RECIPE_CACHE_TIMEOUT", 300)
+
+
+def _version_key(user_id: int) -> str:
+    return f"recipe:version:{user_id}"
+
+
+def _modified_key(user_id: int) -> str:
+    return f"recipe:modified:{user_id}"
+
+
+def get_user_version(user_id: int) -> Tuple[int, float]:
+    """Return cache version and last modification time of user recipes"""
+
+    version_key, modified_key = _version_key(user_id), _modified_key(user_id)
+    values = cache.get_many([version_key, modified_key])
+
+    if version_key not in values:
+        # start from a clock value so a lost counter never reuses an old version
+        cache.add(version_key, time.time_ns() // 1000, None)
+        cache.add(modified_key, time.time(), None)
+        values = cache.get_many([version_key, modified_key])
+
+    return values.get(version_key, 0), values.get(modified_key, time.time())
+
+
+def _bump_user_version(user_id: int) -> None:
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # counter was evicted, next read starts a fresh one
+        pass
+    cache.set(_modified_key(user_id), time.time(), None)
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Mark every cached recipe response of the user as stale"""
+
+    _bump_user_version(user_id)
+    # bump again once committed so readers can't cache pre-commit rows
+    transaction.on_commit(lambda: _bump_user_version(user_id))
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve from the cache with ETag/Last-Modified support
+
+    Must come before the DRF viewset in the bases so it wraps its actions.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        invalidate_user_cache(request.user.pk)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        invalidate_user_cache(request.user.pk)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        response = super().destroy(request, *args, **kwargs)
+        invalidate_user_cache(request.user.pk)
+        return response
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return a 304, a cached response or call the handler and cache it"""
+
+        user_id = request.user.pk
+        version, modified = get_user_version(user_id)
+        # negotiated renderer depends on Accept, keep its variants apart
+        variant = f"{user_id}:{version}:{request.build_absolute_uri()}:{request.META.get('HTTP_ACCEPT', '')}"
+        digest = hashlib.md5(variant.encode()).hexdigest()
+        etag = quote_etag(digest)
+        # HTTP dates are whole seconds, a write later in the current one would
+        # keep the date a client revalidates with, so it's only sent once over
+        last_modified = int(modified) if int(modified) < int(time.time()) else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+        if response is None:
+            key = f"recipe:response:{user_id}:{digest}"
+            data = cache.get(key)
+
+            if data is None:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, response.data, RESPONSE_TIMEOUT)
+            else:
+                response = Response(data)
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Accept", "Authorization"])
+
+        return response
@@ -0,0 +1,53 @@
+"""Streaming export of recipes"""
+
+import csv
+from typing import Iterable, Iterator, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from recipe.serializers import RecipeRowEncoder
+from rest_framework.negotiation import BaseContentNegotiation
+
+# columns of an exported recipe, also accepted by the import command
+EXPORT_FIELDS = ["id", "title", "description", "time_minutes", "price", "link"]
+
+
+class Echo:
+    """File like object handing written lines straight back to csv.writer"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def ndjson_lines(rows: Iterable[Sequence], fields: Sequence[str] = EXPORT_FIELDS) -> Iterator[str]:
+    """Yield one JSON document per row, decimals are rendered as strings"""
+
+    row_encoder = RecipeRowEncoder(fields)
+    json_encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield json_encoder.encode(row_encoder.encode(row)) + "\n"
+
+
+def csv_lines(rows: Iterable[Sequence], fields: Sequence[str] = EXPORT_FIELDS) -> Iterator[str]:
+    """Yield a header line followed by one CSV line per row"""
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# content type and generator of every supported export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_lines),
+    "csv": ("text/csv", csv_lines),
+}
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Let export pick its own content type whatever the Accept header"""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
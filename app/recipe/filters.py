@@ -0,0 +1,116 @@
+"""Filters for recipe APIs"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+# must match the configuration of the search_vector trigger
+SEARCH_CONFIG = "english"
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """Full text search over title and description with ?search=
+
+    Matches are ranked by relevance (title weighs more than description).
+    When nothing matches, word prefixes and trigram similarity of the title
+    are tried so partial words and typos still find recipes. Ranking only
+    orders unpaginated responses, cursor pages keep their -id order.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        matches = (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "-id")
+        )
+        if matches.exists():
+            return matches
+
+        # both conditions are served by the GIN indexes
+        fallback = Q(title__trigram_similar=terms)
+        words = re.findall(r"\w+", terms)
+        if words:
+            prefix_terms = " & ".join(f"{word}:*" for word in words)
+            prefix_query = SearchQuery(prefix_terms, config=SEARCH_CONFIG, search_type="raw")
+            fallback |= Q(search_vector=prefix_query)
+
+        return (
+            queryset.filter(fallback)
+            .annotate(similarity=TrigramSimilarity("title", terms))
+            .order_by("-similarity", "-id")
+        )
+
+
+class RecipeRangeFilter(BaseFilterBackend):
+    """Bound price and time with ?min_<field>= / ?max_<field>=
+
+    e.g. ?max_time_minutes=30&max_price=10 for recipes under 30 minutes
+    and $10. Values are validated like the serializer fields.
+    """
+
+    range_fields = {
+        "price": serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0),
+        "time_minutes": serializers.IntegerField(min_value=0),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        filters, errors = {}, {}
+
+        for field_name, field in self.range_fields.items():
+            for bound, lookup in (("min", "gte"), ("max", "lte")):
+                param = f"{bound}_{field_name}"
+                if param not in request.query_params:
+                    continue
+
+                try:
+                    filters[f"{field_name}__{lookup}"] = field.run_validation(request.query_params[param])
+                except ValidationError as error:
+                    errors[param] = error.detail
+
+        if errors:
+            raise ValidationError(errors)
+
+        return queryset.filter(**filters)
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    """Order by one allow-listed field with ?ordering=, e.g. ?ordering=-price
+
+    Unknown fields are rejected rather than silently ignored. id is added
+    in the same direction as tie breaker, which keeps cursor pages stable
+    and matches the composite (user, field, id) indexes.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return self.get_default_ordering(view)
+
+        fields = [param.strip() for param in params.split(",")]
+        valid_fields = [item[0] for item in self.get_valid_fields(queryset, view, {"request": request})]
+        if len(fields) != 1 or fields[0].lstrip("-") not in valid_fields:
+            raise ValidationError({self.ordering_param: [f"Order by one of: {', '.join(valid_fields)}."]})
+
+        field = fields[0]
+        if field.lstrip("-") == "id":
+            return (field,)
+
+        return (field, "-id" if field.startswith("-") else "id")
+
+    def filter_queryset(self, request, queryset, view):
+        # without an explicit ordering keep the queryset order, e.g. search rank
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,61 @@
+"""
+Django command comparing RecipeSerializer with RecipeRowEncoder throughput
+"""
+import json
+from decimal import Decimal
+
+from core.benchmark import measure, summarize
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe.serializers import RecipeRowEncoder, RecipeSerializer
+
+
+class Command(BaseCommand):
+    help = "Measure rows/sec of the list serializer versus the values_list row encoder"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="list sizes to benchmark")
+        parser.add_argument("--repeat", type=int, default=5, help="timed runs per size and serializer")
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        results = []
+
+        # benchmark data is never committed
+        with transaction.atomic():
+            user = get_user_model().objects.create_user("benchmark-serializers@example.com", None)  # type: ignore
+            created = 0
+
+            for rows in sorted(options["rows"]):
+                Recipe.objects.bulk_create(
+                    Recipe(user=user, title=f"Recipe {i}", time_minutes=i % 120, price=Decimal("9.99"))
+                    for i in range(created, rows)
+                )
+                created = max(created, rows)
+                queryset = Recipe.objects.filter(user=user).order_by("-id")[:rows]
+                encoder = RecipeRowEncoder()
+
+                candidates = {
+                    "serializer": lambda: RecipeSerializer(queryset.all(), many=True).data,
+                    "row_encoder": lambda: encoder.encode_many(queryset.values_list(*encoder.fields)),
+                }
+                for name, func in candidates.items():
+                    summary = summarize(measure(func, options["repeat"]))
+                    summary.update(name=name, rows=rows, rows_per_sec=rows / (summary["p50_ms"] / 1000))
+                    results.append(summary)
+
+            transaction.set_rollback(True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:>12} {result['rows']:>7} rows  "
+                f"p50 {result['p50_ms']:9.2f} ms  {result['rows_per_sec']:>12,.0f} rows/s"
+            )
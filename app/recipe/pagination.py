@@ -0,0 +1,25 @@
+"""Pagination for recipe APIs"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over recipes using opaque cursors
+
+    Pages are fetched with an indexed seek on the ordering key
+    (WHERE id < <last seen id>) instead of OFFSET, so every page costs
+    the same no matter how deep the client is in the collection.
+    """
+
+    ordering = "-id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # pagination is opt in so existing clients keep the plain list response
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        return super().paginate_queryset(queryset, request, view)
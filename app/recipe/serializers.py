@@ -1,13 +1,76 @@
 """Serializers for recipe APIs"""
 
+from typing import Dict, Iterable, List, Sequence
+
 from core.models import Recipe
+from core.serializers import DynamicFieldsMixin, MeasuredSerializerMixin
+from django.conf import settings
 from rest_framework import serializers
 
+# rows per INSERT/UPDATE statement for bulk writes
+BULK_BATCH_SIZE = getattr(settings, "RECIPE_BULK_BATCH_SIZE", 1000)
+
+
+class RecipeBulkSerializer(serializers.ListSerializer):
+    """Persist many recipes with a handful of statements"""
+
+    def create(self, validated_data):
+        recipes = [Recipe(**attrs) for attrs in validated_data]
+        return Recipe.objects.bulk_create(recipes, batch_size=BULK_BATCH_SIZE)
+
+    # instances and validated data are in the same order as the payload
+    def update(self, instances, validated_data):
+        fields = set()
+        for recipe, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(recipe, attr, value)
+            fields.update(attrs)
+
+        if fields:
+            Recipe.objects.bulk_update(instances, fields, batch_size=BULK_BATCH_SIZE)
+
+        return instances
+
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(MeasuredSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for recipes"""
 
     class Meta:
         model = Recipe
         fields = ["id", "title", "time_minutes", "price", "link"]
         read_only_fields = ["id"]
+        # used when serializer is instantiated with many=True
+        list_serializer_class = RecipeBulkSerializer
+
+
+class RecipeRowEncoder:
+    """Render recipe value rows without ModelSerializer field dispatch
+
+    Takes rows of values_list(*fields) and returns the same dicts as
+    RecipeSerializer, columns after fields are ignored. Converters are
+    looked up once per encoder, so the per row work is a zip plus
+    formatting decimals (e.g. price) as strings.
+    """
+
+    def __init__(self, fields: Sequence[str] = tuple(RecipeSerializer.Meta.fields)) -> None:
+        serializer_fields = RecipeSerializer().fields
+        self.fields = tuple(fields)
+        # only decimals need converting, other columns come out of the DB as rendered
+        self._converters = [
+            (index, serializer_fields[name].to_representation)
+            for index, name in enumerate(self.fields)
+            if isinstance(serializer_fields.get(name), serializers.DecimalField)
+        ]
+
+    def encode(self, row: Sequence) -> Dict:
+        if self._converters:
+            row = list(row)
+            for index, convert in self._converters:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+
+        return dict(zip(self.fields, row))
+
+    def encode_many(self, rows: Iterable[Sequence]) -> List[Dict]:
+        encode = self.encode
+        return [encode(row) for row in rows]
@@ -0,0 +1,21 @@
+"""Tests for recipe management commands"""
+
+import json
+from io import StringIO
+
+from core.models import Recipe
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    def test_benchmark_serializers(self) -> None:
+        """Test benchmark reports both serializers and leaves no data behind"""
+
+        out = StringIO()
+
+        call_command("benchmark_serializers", "--rows", "10", "--repeat", "1", "--json", stdout=out)
+
+        results = json.loads(out.getvalue())
+        self.assertEqual({result["name"] for result in results}, {"serializer", "row_encoder"})
+        self.assertFalse(Recipe.objects.exists())
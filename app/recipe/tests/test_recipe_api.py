@@ -1,16 +1,53 @@
 """Tests for recipe APIs"""
 
+import csv
+import json
+import time
 from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
 
 from core.models import Recipe
+from core.tests.utils import QueryBudgetMixin
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from recipe.serializers import RecipeSerializer
+from django.utils.http import http_date
+from recipe.serializers import RecipeRowEncoder, RecipeSerializer
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 RECIPES_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+EXPORT_URL = reverse("recipe:recipe-export")
+ASYNC_RECIPES_URL = reverse("recipe:recipe-list-async")
+
+# most queries a request may run however many recipes there are
+QUERY_BUDGETS = {
+    "GET recipe:recipe-list": 2,
+    "POST recipe:recipe-list": 1,
+    "GET recipe:recipe-detail": 1,
+    "PUT recipe:recipe-detail": 2,
+    "PATCH recipe:recipe-detail": 2,
+    "DELETE recipe:recipe-detail": 2,
+    "POST recipe:recipe-bulk": 3,
+    "PATCH recipe:recipe-bulk": 4,
+    "DELETE recipe:recipe-bulk": 2,
+    "GET recipe:recipe-export": 1,
+    # token lookup included
+    "recipe:recipe-list-async": 2,
+    "recipe:recipe-detail-async": 2,
+}
+
+
+def detail_url(recipe_id: int) -> str:
+    """Create and return a recipe detail URL"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
 
 
 def create_recipe(user: str, **params) -> Recipe:
@@ -29,7 +66,14 @@ def create_recipe(user: str, **params) -> Recipe:
     return Recipe.objects.create(user=user, **defaults)
 
 
-class PublicRecipeAPITests(TestCase):
+class RecipeAPITestCase(QueryBudgetMixin, TestCase):
+    """Requests fail when over their endpoint's query budget"""
+
+    query_budgets = QUERY_BUDGETS
+    strict_query_budgets = True
+
+
+class PublicRecipeAPITests(RecipeAPITestCase):
     """Test public API requests"""
 
     def setUp(self) -> None:
@@ -43,13 +87,15 @@ class PublicRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateRecipeAPITests(TestCase):
+class PrivateRecipeAPITests(RecipeAPITestCase):
     """Test authenticated API requests"""
 
     def setUp(self) -> None:
         self.client = APIClient()
         self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
         self.client.force_authenticate(self.user)
+        # responses are cached per user, don't leak them between tests
+        cache.clear()
 
     def test_retrieve_recipes(self) -> None:
         """Test retrieve a list of recipes"""
@@ -86,3 +132,641 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)  # type: ignore
+
+    def test_list_paginated_with_cursor(self) -> None:
+        """Test recipes can be paged through with opaque cursors"""
+
+        recipes = [create_recipe(self.user, title=f"Recipe {i}") for i in range(5)]
+        expected_ids = [recipe.id for recipe in reversed(recipes)]
+
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data["results"]], expected_ids[:2])  # type: ignore
+        self.assertIsNone(res.data["previous"])  # type: ignore
+
+        # following pages cost a single seek query no matter how deep we go
+        seen_ids = [r["id"] for r in res.data["results"]]  # type: ignore
+        next_url = res.data["next"]  # type: ignore
+        while next_url:
+            with self.assertNumQueries(1):
+                res = self.client.get(next_url)
+            seen_ids += [r["id"] for r in res.data["results"]]  # type: ignore
+            next_url = res.data["next"]  # type: ignore
+
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_list_invalid_cursor(self) -> None:
+        """Test tampered cursor returns not found"""
+
+        create_recipe(self.user)
+
+        res = self.client.get(RECIPES_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_served_from_cache(self) -> None:
+        """Test repeated list requests don't hit the database"""
+
+        create_recipe(self.user)
+        res = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPES_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, res.data)  # type: ignore
+
+    def test_create_recipe_invalidates_cache(self) -> None:
+        """Test creating a recipe is visible on the next list request"""
+
+        self.client.get(RECIPES_URL)
+        payload = {"title": "Sample recipe", "time_minutes": 30, "price": Decimal("5.99")}
+        self.client.post(RECIPES_URL, payload)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 1)  # type: ignore
+        self.assertEqual(res.data[0]["title"], payload["title"])  # type: ignore
+
+    def test_update_recipe_invalidates_cache(self) -> None:
+        """Test updating a recipe is visible on the next retrieve request"""
+
+        recipe = create_recipe(self.user)
+        url = detail_url(recipe.id)
+        self.client.get(url)
+
+        self.client.patch(url, {"title": "New title"})
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["title"], "New title")  # type: ignore
+
+    def test_delete_recipe_invalidates_cache(self) -> None:
+        """Test deleting a recipe is visible on the next list request"""
+
+        recipe = create_recipe(self.user)
+        self.client.get(RECIPES_URL)
+
+        self.client.delete(detail_url(recipe.id))
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data, [])  # type: ignore
+
+    def test_cached_list_limited_to_user(self) -> None:
+        """Test cached responses are not shared between users"""
+
+        create_recipe(self.user)
+        self.client.get(RECIPES_URL)
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        self.client.force_authenticate(other_user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data, [])  # type: ignore
+
+    def test_list_not_modified_with_etag(self) -> None:
+        """Test matching If-None-Match returns 304 until recipes change"""
+
+        recipe = create_recipe(self.user)
+        # starts the user's modification time, Last-Modified follows once its second is over
+        self.client.get(RECIPES_URL)
+        with patch("recipe.cache.time.time", return_value=time.time() + 1):
+            res = self.client.get(RECIPES_URL)
+        etag = res["ETag"]
+
+        self.assertIn("Last-Modified", res)
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(detail_url(recipe.id), {"title": "New title"})
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_last_modified_within_second(self) -> None:
+        """Test Last-Modified is only sent once no write can land in its second"""
+
+        with patch("recipe.cache.time.time") as patched_time:
+            patched_time.return_value = 1001.1
+            recipe = create_recipe(self.user)
+            patched_time.return_value = 1001.2
+            res = self.client.get(RECIPES_URL)
+            self.assertFalse(res.has_header("Last-Modified"))
+
+            patched_time.return_value = 1001.4
+            self.client.patch(detail_url(recipe.id), {"title": "New title"})
+            patched_time.return_value = 1001.5
+            res = self.client.get(RECIPES_URL, HTTP_IF_MODIFIED_SINCE=http_date(1001))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            patched_time.return_value = 1002.0
+            res = self.client.get(RECIPES_URL)
+            self.assertEqual(res["Last-Modified"], http_date(1001))
+            res = self.client.get(RECIPES_URL, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"])
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_bulk_create_recipes(self) -> None:
+        """Test creating many recipes with a constant number of queries"""
+
+        payload = [{"title": f"Recipe {i}", "time_minutes": 10, "price": "2.50"} for i in range(50)]
+
+        # savepoint, batched insert, savepoint release
+        with self.assertNumQueries(3):
+            res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 50)  # type: ignore
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 50)
+
+    def test_bulk_create_returns_item_errors(self) -> None:
+        """Test invalid items are reported in order and nothing is saved"""
+
+        payload = [
+            {"title": "Valid", "time_minutes": 10, "price": "2.50"},
+            {"title": "Missing time", "price": "2.50"},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})  # type: ignore
+        self.assertIn("time_minutes", res.data[1])  # type: ignore
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_requires_list(self) -> None:
+        """Test bulk payload must be a non empty list"""
+
+        for payload in [{"title": "Not a list"}, []]:
+            res = self.client.post(BULK_URL, payload, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_recipes(self) -> None:
+        """Test partially updating many recipes at once"""
+
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        payload = [{"id": recipe.id, "title": f"New {recipe.id}"} for recipe in recipes]
+
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for recipe in recipes:
+            recipe.refresh_from_db()
+            self.assertEqual(recipe.title, f"New {recipe.id}")
+            self.assertEqual(recipe.time_minutes, 22)
+
+    def test_bulk_update_other_user_recipe_error(self) -> None:
+        """Test recipes of other users can't be bulk updated"""
+
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        own, other = create_recipe(self.user), create_recipe(other_user)
+        payload = [{"id": own.id, "title": "New"}, {"id": other.id, "title": "New"}, {"title": "No id"}]
+
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})  # type: ignore
+        self.assertIn("id", res.data[1])  # type: ignore
+        self.assertIn("id", res.data[2])  # type: ignore
+        own.refresh_from_db()
+        self.assertNotEqual(own.title, "New")
+
+    def test_bulk_update_duplicate_id_error(self) -> None:
+        """Test a recipe can only be updated once per request"""
+
+        recipe = create_recipe(self.user)
+        payload = [{"id": recipe.id, "title": "First"}, {"id": recipe.id, "title": "Second"}]
+
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, [{}, {"id": ["Duplicate recipe id."]}])  # type: ignore
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Sample recipe title")
+
+    def test_bulk_delete_recipes(self) -> None:
+        """Test deleting many recipes at once"""
+
+        recipes = [create_recipe(self.user) for _ in range(3)]
+
+        res = self.client.delete(BULK_URL, [recipe.id for recipe in recipes[:2]], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Recipe.objects.filter(user=self.user)), [recipes[2]])
+
+    def test_bulk_delete_other_user_recipe_error(self) -> None:
+        """Test recipes of other users can't be bulk deleted"""
+
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        own, other = create_recipe(self.user), create_recipe(other_user)
+
+        res = self.client.delete(BULK_URL, [own.id, other.id], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_bulk_create_invalidates_cache(self) -> None:
+        """Test bulk created recipes show up in the next list request"""
+
+        self.client.get(RECIPES_URL)
+        self.client.post(BULK_URL, [{"title": "Bulk", "time_minutes": 10, "price": "2.50"}], format="json")
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 1)  # type: ignore
+
+    def test_export_ndjson(self) -> None:
+        """Test exporting recipes streams one JSON document per recipe"""
+
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        create_recipe(other_user)
+        recipes = [create_recipe(self.user, title=f"Recipe {i}") for i in range(3)]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(EXPORT_URL)
+            lines = b"".join(res.streaming_content).decode().splitlines()  # type: ignore
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["id"] for row in rows], [recipe.id for recipe in reversed(recipes)])
+        self.assertEqual(rows[0]["price"], "5.25")
+        self.assertEqual(rows[0]["description"], "Sample description")
+
+    def test_export_csv(self) -> None:
+        """Test exporting recipes as CSV with a header row"""
+
+        recipe = create_recipe(self.user, title="Title, with comma")
+
+        res = self.client.get(EXPORT_URL, {"export_format": "csv"}, HTTP_ACCEPT="text/csv")
+        lines = b"".join(res.streaming_content).decode().splitlines()  # type: ignore
+        rows = list(csv.DictReader(lines))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], str(recipe.id))
+        self.assertEqual(rows[0]["title"], recipe.title)
+        self.assertEqual(rows[0]["price"], "5.25")
+
+    def test_export_unknown_format_error(self) -> None:
+        """Test unsupported export format is rejected"""
+
+        res = self.client.get(EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_price_and_time(self) -> None:
+        """Test range filters on price and time_minutes"""
+
+        quick_cheap = create_recipe(self.user, time_minutes=20, price=Decimal("8.00"))
+        create_recipe(self.user, time_minutes=45, price=Decimal("8.00"))
+        create_recipe(self.user, time_minutes=20, price=Decimal("12.00"))
+
+        res = self.client.get(RECIPES_URL, {"max_time_minutes": 30, "max_price": "10"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data], [quick_cheap.id])  # type: ignore
+
+    def test_filter_invalid_value_error(self) -> None:
+        """Test malformed range values are rejected"""
+
+        res = self.client.get(RECIPES_URL, {"min_price": "cheap", "max_time_minutes": -1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_price", res.data)  # type: ignore
+        self.assertIn("max_time_minutes", res.data)  # type: ignore
+
+    def test_order_by_price(self) -> None:
+        """Test ordering by an allowed field breaks ties by id"""
+
+        first = create_recipe(self.user, price=Decimal("3.00"))
+        second = create_recipe(self.user, price=Decimal("3.00"))
+        cheapest = create_recipe(self.user, price=Decimal("1.00"))
+
+        res = self.client.get(RECIPES_URL, {"ordering": "price"})
+        self.assertEqual([r["id"] for r in res.data], [cheapest.id, first.id, second.id])  # type: ignore
+
+        res = self.client.get(RECIPES_URL, {"ordering": "-price"})
+        self.assertEqual([r["id"] for r in res.data], [second.id, first.id, cheapest.id])  # type: ignore
+
+    def test_order_by_unknown_field_error(self) -> None:
+        """Test only allow-listed ordering fields are accepted"""
+
+        for ordering in ["title", "price,time_minutes"]:
+            res = self.client.get(RECIPES_URL, {"ordering": ordering})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_paginate_ordered_by_time(self) -> None:
+        """Test cursor pages follow the requested ordering"""
+
+        times = [30, 10, 20, 10, 40]
+        for minutes in times:
+            create_recipe(self.user, time_minutes=minutes)
+
+        seen = []
+        res = self.client.get(RECIPES_URL, {"ordering": "time_minutes", "page_size": 2})
+        while True:
+            seen += [r["time_minutes"] for r in res.data["results"]]  # type: ignore
+            if not res.data["next"]:  # type: ignore
+                break
+            res = self.client.get(res.data["next"])  # type: ignore
+
+        self.assertEqual(seen, sorted(times))
+
+    def test_row_encoder_matches_serializer(self) -> None:
+        """Test value rows render exactly like the model serializer"""
+
+        create_recipe(self.user, price=Decimal("5.5"), link="")
+        create_recipe(self.user, price=Decimal("10.00"))
+        recipes = Recipe.objects.order_by("-id")
+        encoder = RecipeRowEncoder()
+
+        rows = encoder.encode_many(recipes.values_list(*encoder.fields))
+
+        self.assertEqual(rows, RecipeSerializer(recipes, many=True).data)
+        self.assertEqual(rows[1]["price"], "5.50")
+
+    def test_list_sparse_fields(self) -> None:
+        """Test ?fields= and ?omit= trim list items and the selected columns"""
+
+        create_recipe(self.user, title="Recipe")
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data[0]), ["id", "title"])  # type: ignore
+        self.assertNotIn('"price"', queries[-1]["sql"])
+
+        res = self.client.get(RECIPES_URL, {"omit": "link,price"})
+        self.assertEqual(list(res.data[0]), ["id", "title", "time_minutes"])  # type: ignore
+
+    def test_list_sparse_fields_paginated(self) -> None:
+        """Test cursor pages still work when the ordering field is not requested"""
+
+        for price in ["3.00", "1.00", "2.00"]:
+            create_recipe(self.user, title=f"Recipe {price}", price=Decimal(price))
+
+        res = self.client.get(RECIPES_URL, {"fields": "title", "ordering": "price", "page_size": 2})
+        titles = [item["title"] for item in res.data["results"]]  # type: ignore
+        res = self.client.get(res.data["next"])  # type: ignore
+        titles += [item["title"] for item in res.data["results"]]  # type: ignore
+
+        self.assertEqual(titles, ["Recipe 1.00", "Recipe 2.00", "Recipe 3.00"])
+        self.assertEqual(list(res.data["results"][0]), ["title"])  # type: ignore
+
+    def test_retrieve_sparse_fields(self) -> None:
+        """Test detail responses and their query skip fields left out"""
+
+        recipe = create_recipe(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(detail_url(recipe.id), {"fields": "title,price"})
+
+        self.assertEqual(res.data, {"title": recipe.title, "price": "5.25"})  # type: ignore
+        self.assertNotIn('"description"', queries[-1]["sql"])
+
+    def test_sparse_fields_unknown_error(self) -> None:
+        """Test unknown or no remaining fields are rejected"""
+
+        res = self.client.get(RECIPES_URL, {"fields": "id,secret"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", res.data["fields"][0])  # type: ignore
+
+        res = self.client.get(RECIPES_URL, {"fields": "id", "omit": "id"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sparse_fields_ignored_by_writes(self) -> None:
+        """Test writes validate and return every field"""
+
+        payload = {"title": "Recipe", "time_minutes": 5, "price": "5.00"}
+        res = self.client.post(f"{RECIPES_URL}?fields=id", payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn("title", res.data)  # type: ignore
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"recipe_write": "2/min"}})
+    def test_writes_throttled(self) -> None:
+        """Test recipe writes are limited per user while reads are not"""
+
+        payload = {"title": "Recipe", "time_minutes": 5, "price": Decimal("5.00")}
+        for _ in range(2):
+            self.client.post(RECIPES_URL, payload)
+
+        res = self.client.post(RECIPES_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(Recipe.objects.count(), 2)
+        self.assertEqual(self.client.get(RECIPES_URL).status_code, status.HTTP_200_OK)
+
+
+class AsyncRecipeAPITests(RecipeAPITestCase):
+    """Test the async recipe read endpoints"""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        cache.clear()
+
+    def test_auth_required(self) -> None:
+        """Test requests without a valid token are rejected"""
+
+        res = APIClient().get(ASYNC_RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_endpoint(self) -> None:
+        """Test async list returns the same recipes as the sync one"""
+
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        create_recipe(other_user)
+        create_recipe(self.user, price=Decimal("3.00"))
+        create_recipe(self.user, price=Decimal("1.00"))
+
+        for params in [{}, {"ordering": "price"}, {"page_size": 1}]:
+            res = self.client.get(ASYNC_RECIPES_URL, params)
+            expected = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            # page links point back at the endpoint that served them
+            self.assertEqual(res.content.replace(b"/async/recipes/", b"/recipes/"), expected.content)
+
+    def test_conditional_get(self) -> None:
+        """Test async reads are cached with ETags like the sync ones"""
+
+        recipe = create_recipe(self.user)
+
+        # starts the user's modification time, Last-Modified follows once its second is over
+        self.client.get(ASYNC_RECIPES_URL)
+        for url in [ASYNC_RECIPES_URL, reverse("recipe:recipe-detail-async", args=[recipe.id])]:
+            with patch("recipe.cache.time.time", return_value=time.time() + 1):
+                res = self.client.get(url)
+            self.assertIn("Authorization", res["Vary"])
+            self.assertTrue(res.has_header("Last-Modified"))
+
+            with self.assertNumQueries(0):
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_sparse_fields(self) -> None:
+        """Test ?fields= applies to the async list as well"""
+
+        create_recipe(self.user)
+
+        res = self.client.get(ASYNC_RECIPES_URL, {"fields": "id,title"})
+
+        self.assertEqual(list(res.json()[0]), ["id", "title"])
+
+    def test_list_invalid_params_error(self) -> None:
+        """Test validation errors are reported like the sync endpoint"""
+
+        res = self.client.get(ASYNC_RECIPES_URL, {"ordering": "title"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", res.json())
+
+    def test_retrieve_recipe(self) -> None:
+        """Test retrieving own recipe and not finding others"""
+
+        recipe = create_recipe(self.user)
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        other = create_recipe(other_user)
+
+        res = self.client.get(reverse("recipe:recipe-detail-async", args=[recipe.id]))
+        self.assertEqual(res.json(), RecipeSerializer(recipe).data)
+
+        res = self.client.get(reverse("recipe:recipe-detail-async", args=[other.id]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_write_not_allowed(self) -> None:
+        """Test the async path is read only"""
+
+        res = self.client.post(ASYNC_RECIPES_URL, {"title": "Recipe"})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@skipUnless(connection.vendor == "postgresql", "query plans are postgres specific")
+class RecipeQueryPlanTests(RecipeAPITestCase):
+    """Test recipe list queries are served by indexes"""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        others = [
+            get_user_model().objects.create_user(f"user{i}@example.com", "testpass123")  # type: ignore
+            for i in range(9)
+        ]
+        # enough rows that sorting a user's recipes isn't free, whatever earlier tests left in the table
+        Recipe.objects.bulk_create(
+            Recipe(user=user, title="Sample recipe", time_minutes=i % 60, price=Decimal(i % 50))
+            for user in [self.user, *others]
+            for i in range(200)
+        )
+
+        # small test tables are cheaper to scan, make the planner show its index choice
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    def assertIndexScanWithoutSort(self, queryset, index: str = "recipe_user_id_desc_idx") -> None:
+        plan = queryset.explain()
+
+        self.assertIn(index, plan)
+        self.assertIn("Index Scan", plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_list_query_uses_index(self) -> None:
+        """Test user recipe listing reads the composite index in order"""
+
+        self.assertIndexScanWithoutSort(Recipe.objects.filter(user=self.user).order_by("-id"))
+
+    def test_cursor_page_query_uses_index(self) -> None:
+        """Test a cursor page seeks into the composite index"""
+
+        queryset = Recipe.objects.filter(user=self.user, id__lt=10**6).order_by("-id")[:101]
+
+        self.assertIndexScanWithoutSort(queryset)
+
+    def test_price_filter_and_ordering_use_index(self) -> None:
+        """Test price range filter ordered by price reads the price index"""
+
+        queryset = Recipe.objects.filter(user=self.user, price__lte=10).order_by("price", "id")
+
+        self.assertIndexScanWithoutSort(queryset, "recipe_user_price_idx")
+
+    def test_time_filter_and_ordering_use_index(self) -> None:
+        """Test time range filter ordered by time reads the time index"""
+
+        queryset = Recipe.objects.filter(user=self.user, time_minutes__lte=30).order_by("-time_minutes", "-id")
+
+        self.assertIndexScanWithoutSort(queryset, "recipe_user_time_idx")
+
+
+class RecipeSearchTests(RecipeAPITestCase):
+    """Test searching recipes"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@example.com", "testpass123")  # type: ignore
+        self.client.force_authenticate(self.user)
+        cache.clear()
+
+    def search(self, terms: str):
+        res = self.client.get(RECIPES_URL, {"search": terms})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe["title"] for recipe in res.data]  # type: ignore
+
+    def test_search_ranks_title_matches_first(self) -> None:
+        """Test matches in title rank above matches in description"""
+
+        create_recipe(self.user, title="Tomato soup", description="Creamy")
+        create_recipe(self.user, title="Pasta", description="With a tomato sauce")
+        create_recipe(self.user, title="Pancakes", description="Fluffy")
+
+        self.assertEqual(self.search("tomatoes"), ["Tomato soup", "Pasta"])
+
+    def test_search_vector_follows_updates(self) -> None:
+        """Test updated recipes are found by their new title"""
+
+        recipe = create_recipe(self.user, title="Pancakes", description="")
+        recipe.title = "Waffles"
+        recipe.save()
+
+        self.assertEqual(self.search("waffles"), ["Waffles"])
+        self.assertEqual(self.search("pancakes"), [])
+
+    def test_search_vector_not_loaded(self) -> None:
+        """Test recipes are fetched without their search vector"""
+
+        recipe = create_recipe(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(detail_url(recipe.id), {"title": "Renamed"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if "search_vector" in query["sql"]])
+        self.assertEqual(self.search("renamed"), ["Renamed"])
+
+    def test_search_prefix_and_typo_fallback(self) -> None:
+        """Test partial words and typos still find recipes"""
+
+        create_recipe(self.user, title="Chicken curry", description="")
+        create_recipe(self.user, title="Beef stew", description="")
+
+        self.assertEqual(self.search("chick"), ["Chicken curry"])
+        self.assertEqual(self.search("chiken curry"), ["Chicken curry"])
+
+    def test_search_limited_to_user(self) -> None:
+        """Test search only returns recipes of the authenticated user"""
+
+        other_user = get_user_model().objects.create_user("other@example.com", "testpass123")  # type: ignore
+        create_recipe(other_user, title="Tomato soup")
+
+        self.assertEqual(self.search("tomato"), [])
@@ -1,7 +1,7 @@
 """URL mappings for the recipe app"""
 
 from django.urls import include, path
-from recipe import views
+from recipe import async_views, views
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -12,4 +12,9 @@ router.register("recipes", views.RecipeViewSet)
 app_name = "recipe"
 
 # include urls generated by the router
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    # async read path for ASGI deployments
+    path("async/recipes/", async_views.recipe_list, name="recipe-list-async"),
+    path("async/recipes/<int:pk>/", async_views.recipe_detail, name="recipe-detail-async"),
+]
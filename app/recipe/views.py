@@ -1,21 +1,205 @@
 """Views for recipe APIs"""
 
+from typing import Dict, List
+
+from core.authentication import CachedTokenAuthentication
+from core.metrics import measure_serialization
+from core.db_router import ReplicaReadMixin
 from core.models import Recipe
+from core.throttling import RecipeWriteRateThrottle
+from core.views import SparseFieldsMixin
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from recipe import serializers
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from recipe.cache import CachedResponseMixin, invalidate_user_cache
+from recipe.export import EXPORT_FIELDS, EXPORT_FORMATS, IgnoreClientContentNegotiation
+from recipe.filters import RecipeOrderingFilter, RecipeRangeFilter, RecipeSearchFilter
+from recipe.pagination import RecipeCursorPagination
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+# upper bound of items accepted by a single bulk request
+BULK_MAX_ITEMS = getattr(settings, "RECIPE_BULK_MAX_ITEMS", 10000)
+# rows fetched per round trip of the export server side cursor
+EXPORT_CHUNK_SIZE = getattr(settings, "RECIPE_EXPORT_CHUNK_SIZE", 2000)
+
 
+def _is_id(value) -> bool:
+    # bool is an int subclass but never a valid id
+    return isinstance(value, int) and not isinstance(value, bool)
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+class RecipeViewSet(ReplicaReadMixin, CachedResponseMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """View for manage recipe APIs"""
 
     serializer_class = serializers.RecipeSerializer
     # objects that are available for this viewset
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [RecipeWriteRateThrottle]
+    # opt in keyset pagination with ?page_size= / ?cursor=
+    pagination_class = RecipeCursorPagination
+    # ?min_/max_price, ?min_/max_time_minutes, ranked ?search= and ?ordering=
+    filter_backends = [RecipeRangeFilter, RecipeSearchFilter, RecipeOrderingFilter]
+    ordering_fields = ["id", "price", "time_minutes"]
+    ordering = ["-id"]
+    # actions rendered from values_list() rows by RecipeRowEncoder instead of
+    # going through RecipeSerializer, drop one to use the serializer again
+    row_encoder_actions = ["list"]
+    # ?fields= / ?omit= trim the response and the columns selected
+    sparse_fields_actions = ["list", "retrieve"]
 
     def get_queryset(self):
         # overwrite to only receive recipes for authenticated user
-        return self.queryset.filter(user=self.request.user).order_by("-id")
+        queryset = self.queryset.filter(user=self.request.user).order_by("-id")
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # leaves out the unbounded description and the search vector among others
+            return queryset.only(*fields)
+
+        # only filters read the search vector, which is about the size of the description
+        return queryset.defer("search_vector")
+
+    def list(self, request, *args, **kwargs):
+        if self.action in self.row_encoder_actions:
+            return self.cached_response(self.list_rows, request, *args, **kwargs)
+
+        return super().list(request, *args, **kwargs)
+
+    def list_rows(self, request, *args, **kwargs):
+        """List recipes from value rows, skipping model and serializer overhead"""
+
+        fields = self.get_sparse_fields()
+        encoder = serializers.RecipeRowEncoder(fields) if fields else serializers.RecipeRowEncoder()
+        queryset = self.filter_queryset(self.get_queryset())
+        # named rows so cursor pagination can read the ordering fields, which
+        # are selected after the encoded ones when not requested
+        ordering = [name.lstrip("-") for name in queryset.query.order_by if isinstance(name, str)]
+        extra = [name for name in dict.fromkeys(ordering) if name not in encoder.fields]
+        queryset = queryset.values_list(*encoder.fields, *extra, named=True)
+
+        page = self.paginate_queryset(queryset)
+        with measure_serialization():
+            data = encoder.encode_many(queryset if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+
+        return Response(data)
+
+    def perform_create(self, serializer):
+        # recipes are always created for the authenticated user
+        serializer.save(user=self.request.user)
+
+    # bulk endpoints accept a JSON list and either apply every item or none
+    # per item errors are returned in payload order, {} for valid items
+    @action(detail=False, methods=["post"], url_path="bulk", url_name="bulk")
+    def bulk(self, request):
+        """Create many recipes in a single transaction"""
+
+        items = self._get_bulk_items(request)
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            serializer.save(user=request.user)
+        invalidate_user_cache(request.user.pk)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """Partially update many recipes identified by id"""
+
+        items = self._get_bulk_items(request)
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        recipes = self._get_owned_recipes(ids)
+        # updates of one recipe would be applied once but all of them returned
+        id_errors = self._get_id_errors(ids, recipes, unique=True)
+
+        serializer = self.get_serializer(
+            [recipes.get(recipe_id) for recipe_id in ids], data=items, many=True, partial=True
+        )
+        serializer.is_valid()
+        # valid serializer has no per item errors, only id lookups may fail
+        item_errors = serializer.errors or [{}] * len(items)
+        errors = [{**field_errors, **id_item_errors} for field_errors, id_item_errors in zip(item_errors, id_errors)]
+        if any(errors):
+            raise ValidationError(errors)
+
+        with transaction.atomic():
+            serializer.save()
+        invalidate_user_cache(request.user.pk)
+
+        return Response(serializer.data)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete many recipes by id with a single statement"""
+
+        ids = self._get_bulk_items(request)
+        recipes = self._get_owned_recipes(ids)
+        errors = self._get_id_errors(ids, recipes)
+        if any(errors):
+            raise ValidationError(errors)
+
+        self.get_queryset().filter(id__in=list(recipes)).delete()
+        invalidate_user_cache(request.user.pk)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["get"], content_negotiation_class=IgnoreClientContentNegotiation)
+    def export(self, request):
+        """Stream every recipe of the user as NDJSON (default) or CSV"""
+
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"export_format": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]})
+        content_type, encode = EXPORT_FORMATS[export_format]
+
+        # plain tuples from a server side cursor, memory stays flat for any collection size
+        rows = self.get_queryset().values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(encode(rows), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="recipes.{export_format}"'
+
+        return response
+
+    def _get_bulk_items(self, request) -> List:
+        """Return bulk payload list or raise if it is not one"""
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non empty list of items."]})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({"non_field_errors": [f"Ensure there are no more than {BULK_MAX_ITEMS} items."]})
+
+        return items
+
+    def _get_owned_recipes(self, ids: List) -> Dict[int, Recipe]:
+        """Fetch recipes of the authenticated user by id with one query"""
+        valid_ids = [recipe_id for recipe_id in ids if _is_id(recipe_id)]
+        return self.get_queryset().in_bulk(valid_ids)
+
+    def _get_id_errors(self, ids: List, recipes: Dict[int, Recipe], unique: bool = False) -> List[Dict]:
+        """Return per item id errors in payload order, repeated ids are errors when unique"""
+
+        errors = []
+        seen = set()
+        for recipe_id in ids:
+            if not _is_id(recipe_id):
+                errors.append({"id": ["A valid integer is required."]})
+            elif recipe_id not in recipes:
+                errors.append({"id": ["Recipe not found."]})
+            elif unique and recipe_id in seen:
+                errors.append({"id": ["Duplicate recipe id."]})
+            else:
+                errors.append({})
+            if _is_id(recipe_id):
+                seen.add(recipe_id)
+
+        return errors
@@ -0,0 +1,29 @@
+"""Async read views for the user api"""
+
+from core.authentication import aauthenticate_token
+from core.http import SAFE_METHODS, json_response, unauthorized_response
+from django.http import HttpResponseNotAllowed
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from user.serializers import UserSerializer
+from user.views import ManageUserView
+
+
+async def me(request):
+    """Return the authenticated user, no DB access once the token is cached"""
+
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+
+    user = await aauthenticate_token(request)
+    if user is None:
+        return unauthorized_response()
+
+    # ?fields= / ?omit= as on the sync endpoint
+    view = ManageUserView(request=Request(request), format_kwarg=None)
+    try:
+        fields = view.get_sparse_fields()
+    except ValidationError as exc:
+        return json_response(exc.detail, exc.status_code)
+
+    return json_response(UserSerializer(user, fields=fields).data)
@@ -0,0 +1,104 @@
+"""
+Django command measuring /api/user/token/ throughput per password hasher
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from core import hashers
+from core.benchmark import summarize
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+HASHERS = {
+    "argon2": "core.hashers.Argon2PasswordHasher",
+    "pbkdf2": "core.hashers.PBKDF2PasswordHasher",
+}
+
+EMAIL = "benchmark-token@example.com"
+PASSWORD = "benchmark-pass-123"
+
+
+class Command(BaseCommand):
+    help = "Issue tokens in process with concurrent clients and report req/s and latency per password hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hashers", nargs="+", choices=list(HASHERS), default=list(HASHERS))
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="parallel clients")
+        parser.add_argument("--requests", type=int, default=20, help="token requests per hasher and concurrency")
+        parser.add_argument(
+            "--hashing-workers",
+            type=int,
+            help="size of the hashing pool for the run, defaults to PASSWORD_HASHING_WORKERS",
+        )
+        parser.add_argument("--json", action="store_true", help="print machine readable results")
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+
+        results = []
+        pool = hashers.hashing_pool
+        if options["hashing_workers"] is not None:
+            hashers.hashing_pool = hashers.HashingPool(options["hashing_workers"], queue_size=1000, timeout=60)
+
+        # measure hashing throughput, not the rate limits
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"token": None, "token_email": None}}
+
+        # client threads use their own connections, the user must be committed
+        user = get_user_model().objects.create_user(EMAIL, PASSWORD)  # type: ignore
+        try:
+            for name in options["hashers"]:
+                with override_settings(PASSWORD_HASHERS=[HASHERS[name]], REST_FRAMEWORK=rest_framework):
+                    user.set_password(PASSWORD)
+                    user.save(update_fields=["password"])
+
+                    for concurrency in options["concurrency"]:
+                        summary = self.run(concurrency, options["requests"])
+                        summary.update(hasher=name, concurrency=concurrency)
+                        results.append(summary)
+        finally:
+            user.delete()
+            hashers.hashing_pool = pool
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['hasher']:>7} c={result['concurrency']:<3} {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+            )
+
+    def run(self, concurrency: int, total: int):
+        """Send total token requests from concurrency threads"""
+
+        url = reverse("user:token")
+        shares = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+
+        def client_loop(count: int) -> List[tuple]:
+            # localhost passes the DEBUG ALLOWED_HOSTS check, testserver only does in tests
+            client = Client(SERVER_NAME="localhost")
+            samples = []
+            try:
+                for _ in range(count):
+                    started = time.perf_counter()
+                    res = client.post(url, {"email": EMAIL, "password": PASSWORD})
+                    samples.append((time.perf_counter() - started, res.status_code == 200))
+            finally:
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            samples = [sample for chunk in executor.map(client_loop, shares) for sample in chunk]
+        elapsed = time.perf_counter() - started
+
+        summary = summarize([duration for duration, _ in samples])
+        summary.update(rps=len(samples) / elapsed, errors=sum(not ok for _, ok in samples))
+        return summary
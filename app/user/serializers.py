@@ -2,13 +2,14 @@
 
 from typing import Dict
 
+from core.serializers import DynamicFieldsMixin, MeasuredSerializerMixin
 from django.contrib.auth import authenticate, get_user_model
 from django.utils.translation import gettext as _
 from rest_framework import serializers  # type: ignore
 
 
 # modelSerializers auto validate and save things to selected model
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(MeasuredSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for user object"""
 
     class Meta:
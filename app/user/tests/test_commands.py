@@ -0,0 +1,37 @@
+"""Tests for user management commands"""
+
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+
+@override_settings(ALLOWED_HOSTS=["localhost"])
+class BenchmarkTokenCommandTests(TransactionTestCase):
+    def test_benchmark_token(self) -> None:
+        """Test benchmark reports every hasher and removes its user"""
+
+        out = StringIO()
+
+        call_command(
+            "benchmark_token",
+            "--concurrency",
+            "1",
+            "2",
+            "--requests",
+            "2",
+            "--hashing-workers",
+            "1",
+            "--json",
+            stdout=out,
+        )
+
+        results = json.loads(out.getvalue())
+        self.assertEqual(
+            {(result["hasher"], result["concurrency"]) for result in results},
+            {("argon2", 1), ("argon2", 2), ("pbkdf2", 1), ("pbkdf2", 2)},
+        )
+        self.assertTrue(all(result["errors"] == 0 for result in results))
+        self.assertFalse(get_user_model().objects.exists())
@@ -1,15 +1,31 @@
 """Tests for user api"""
 
+from unittest.mock import patch
+
+from core.tests.utils import QueryBudgetMixin
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status  # type: ignore
+from rest_framework.authtoken.models import Token  # type: ignore
 from rest_framework.test import APIClient  # type: ignore
 
 # api url we will be testing user - app, create - endpoint
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_URL = reverse("user:me")
+ASYNC_ME_URL = reverse("user:me-async")
+
+# most queries a request may run
+QUERY_BUDGETS = {
+    "POST user:create": 2,
+    # user, then get_or_create of the token in a savepoint
+    "POST user:token": 5,
+    "user:me": 2,
+    "user:me-async": 1,
+}
 
 
 def create_user(**params):
@@ -24,11 +40,20 @@ user_details = {
 }
 
 
-class PublicUserApiTests(TestCase):
+class UserAPITestCase(QueryBudgetMixin, TestCase):
+    """Requests fail when over their endpoint's query budget"""
+
+    query_budgets = QUERY_BUDGETS
+    strict_query_budgets = True
+
+
+class PublicUserApiTests(UserAPITestCase):
     """Test the public features of user api"""
 
     def setUp(self) -> None:
         self.client = APIClient()
+        # throttle counters live in the cache
+        cache.clear()
 
     def test_create_user_success(self) -> None:
         """Test if creating user is successful"""
@@ -97,7 +122,58 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateUserApiTests(TestCase):
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"token": "3/min", "token_email": "2/min", "signup": "1/hour"},
+    }
+)
+class UserThrottleTests(UserAPITestCase):
+    """Test rate limits of the public user endpoints"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        cache.clear()
+
+    @patch("core.hashers.hashing_pool")
+    def test_token_throttled_per_email(self, patched_pool) -> None:
+        """Test repeated attempts on one account are rejected before hashing"""
+
+        patched_pool.run.return_value = False
+        payload = {"email": "test@example.com", "password": "wrong"}
+
+        for _ in range(2):
+            self.assertEqual(self.client.post(TOKEN_URL, payload).status_code, status.HTTP_400_BAD_REQUEST)
+        hashes = patched_pool.run.call_count
+
+        res = self.client.post(TOKEN_URL, {**payload, "email": "TEST@example.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+        self.assertEqual(patched_pool.run.call_count, hashes)
+
+    def test_token_throttled_per_address(self) -> None:
+        """Test attempts from one address are limited across accounts"""
+
+        for i in range(3):
+            self.client.post(TOKEN_URL, {"email": f"test{i}@example.com", "password": "wrong"})
+
+        res = self.client.post(TOKEN_URL, {"email": "other@example.com", "password": "wrong"})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_signup_throttled(self) -> None:
+        """Test account creation is limited per address"""
+
+        self.client.post(CREATE_USER_URL, user_details)
+
+        res = self.client.post(CREATE_USER_URL, {**user_details, "email": "other@example.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(get_user_model().objects.filter(email="other@example.com").exists())
+
+
+class PrivateUserApiTests(UserAPITestCase):
     """Test api request that require authentication"""
 
     def setUp(self) -> None:
@@ -114,6 +190,19 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, {"name": self.user.name, "email": self.user.email})  # type: ignore
 
+    def test_retrieve_profile_sparse_fields(self) -> None:
+        """Test ?fields= and ?omit= pick the profile fields returned"""
+
+        res = self.client.get(ME_URL, {"fields": "name"})
+        self.assertEqual(res.data, {"name": self.user.name})  # type: ignore
+
+        res = self.client.get(ME_URL, {"omit": "name"})
+        self.assertEqual(res.data, {"email": self.user.email})  # type: ignore
+
+        # write only fields can't be requested
+        res = self.client.get(ME_URL, {"fields": "password"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_me_not_allowed(self) -> None:
         """Test POST is not allowed for ME endpoint"""
 
@@ -132,3 +221,42 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload["name"])
         self.assertTrue(self.user.check_password(payload["password"]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class AsyncUserApiTests(UserAPITestCase):
+    """Test the async me endpoint"""
+
+    def setUp(self) -> None:
+        self.user = create_user(**user_details)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def test_retrieve_profile_success(self) -> None:
+        """Test retrieving profile, cached tokens need no queries"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        res = self.client.get(ASYNC_ME_URL)
+        with self.assertNumQueries(0):
+            cached = self.client.get(ASYNC_ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"name": self.user.name, "email": self.user.email})
+        self.assertEqual(cached.json(), res.json())
+
+    def test_retrieve_profile_sparse_fields(self) -> None:
+        """Test ?fields= applies to the async endpoint as well"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.assertEqual(self.client.get(ASYNC_ME_URL, {"fields": "email"}).json(), {"email": self.user.email})
+        self.assertEqual(self.client.get(ASYNC_ME_URL, {"fields": "nope"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_user_unauthorized(self) -> None:
+        """Test invalid token is rejected"""
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ASYNC_ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
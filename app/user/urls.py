@@ -1,7 +1,7 @@
 """URL mappings for the user API"""
 
 from django.urls import path
-from user import views
+from user import async_views, views
 
 app_name = "user"
 
@@ -10,4 +10,6 @@ urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
     path("me/", views.ManageUserView.as_view(), name="me"),
+    # async read path for ASGI deployments
+    path("async/me/", async_views.me, name="me-async"),
 ]
@@ -1,6 +1,9 @@
 """Views for the user api"""
 
-from rest_framework import authentication, generics, permissions
+from core.authentication import CachedTokenAuthentication
+from core.throttling import SignupRateThrottle, TokenEmailRateThrottle, TokenRateThrottle
+from core.views import SparseFieldsMixin
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 from user.serializers import AuthTokenSerializer, UserSerializer
@@ -12,6 +15,7 @@ class CreateUserView(generics.CreateAPIView):
     """Create new user in the system"""
 
     serializer_class = UserSerializer
+    throttle_classes = [SignupRateThrottle]
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -19,15 +23,21 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     render_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # checked before the serializer so rejected attempts never hash a password
+    throttle_classes = [TokenRateThrottle, TokenEmailRateThrottle]
 
 
 # provides functionality for retrieving and updating objs in DB
-class ManageUserView(generics.RetrieveUpdateAPIView):
-    """Manage the authenticated user"""
+class ManageUserView(SparseFieldsMixin, generics.RetrieveUpdateAPIView):
+    """Manage the authenticated user, ?fields= / ?omit= pick the fields returned
+
+    Reads serve request.user, loaded by authentication on the primary or
+    from the token cache, so there is nothing to route to a replica.
+    """
 
     serializer_class = UserSerializer
     # is user authenticated
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     # what user is allowed to do in our system
     permission_classes = [permissions.IsAuthenticated]
 